@@ -0,0 +1,35 @@
+"""comment reply count
+
+Revision ID: 20b2da33b4c2
+Revises: bd29bfad4bb6
+Create Date: 2026-10-19 12:20:37.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20b2da33b4c2'
+down_revision: Union[str, None] = 'bd29bfad4bb6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('comments', sa.Column('reply_count', sa.Integer(), server_default='0', nullable=False))
+
+    # 以現有資料初始化直接回覆數
+    op.execute(
+        "UPDATE comments JOIN ("
+        "SELECT parent_id, COUNT(*) AS total FROM comments "
+        "WHERE parent_id IS NOT NULL GROUP BY parent_id"
+        ") AS counts ON counts.parent_id = comments.id "
+        "SET comments.reply_count = counts.total"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('comments', 'reply_count')
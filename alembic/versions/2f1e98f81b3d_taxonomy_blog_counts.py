@@ -0,0 +1,42 @@
+"""taxonomy blog counts
+
+Revision ID: 2f1e98f81b3d
+Revises: 3b8f1d2c9a47
+Create Date: 2026-10-19 11:05:20.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f1e98f81b3d'
+down_revision: Union[str, None] = '3b8f1d2c9a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tags', sa.Column('blog_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('categories', sa.Column('blog_count', sa.Integer(), server_default='0', nullable=False))
+
+    # 以現有資料初始化已發布文章數
+    op.execute(
+        "UPDATE tags SET blog_count = ("
+        "SELECT COUNT(*) FROM blog_tag_association "
+        "JOIN blogs ON blogs.id = blog_tag_association.blog_id "
+        "WHERE blog_tag_association.tag_id = tags.id AND blogs.is_draft = false)"
+    )
+    op.execute(
+        "UPDATE categories SET blog_count = ("
+        "SELECT COUNT(*) FROM blog_category_association "
+        "JOIN blogs ON blogs.id = blog_category_association.blog_id "
+        "WHERE blog_category_association.category_id = categories.id AND blogs.is_draft = false)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('categories', 'blog_count')
+    op.drop_column('tags', 'blog_count')
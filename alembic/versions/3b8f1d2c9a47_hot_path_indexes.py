@@ -0,0 +1,59 @@
+"""hot path indexes and association primary keys
+
+Revision ID: 3b8f1d2c9a47
+Revises: 66ce4c362ae2
+Create Date: 2026-10-19 10:31:45.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8f1d2c9a47'
+down_revision: Union[str, None] = '66ce4c362ae2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ASSOCIATIONS = [
+    ('blog_tag_association', 'tag_id'),
+    ('blog_category_association', 'category_id'),
+]
+
+
+def upgrade() -> None:
+    op.create_index('ix_blogs_is_draft_created_at', 'blogs', ['is_draft', 'created_at', 'id'], unique=False)
+    op.create_index('ix_blogs_author_id_created_at', 'blogs', ['author_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_comments_blog_id_parent_id_created_at', 'comments',
+                    ['blog_id', 'parent_id', 'created_at'], unique=False)
+    op.create_index('ix_comments_parent_id', 'comments', ['parent_id'], unique=False)
+
+    for table, column in ASSOCIATIONS:
+        # 主鍵建立前先移除重複與空值的關聯
+        op.execute(
+            f"CREATE TABLE {table}_dedup AS SELECT DISTINCT blog_id, {column} FROM {table} "
+            f"WHERE blog_id IS NOT NULL AND {column} IS NOT NULL"
+        )
+        op.execute(f"DELETE FROM {table}")
+        op.execute(f"INSERT INTO {table} (blog_id, {column}) SELECT blog_id, {column} FROM {table}_dedup")
+        op.execute(f"DROP TABLE {table}_dedup")
+
+        op.alter_column(table, 'blog_id', existing_type=sa.String(length=36), nullable=False)
+        op.alter_column(table, column, existing_type=sa.String(length=36), nullable=False)
+        op.create_primary_key(f'pk_{table}', table, ['blog_id', column])
+        op.create_index(f'ix_{table}_{column}', table, [column], unique=False)
+
+
+def downgrade() -> None:
+    for table, column in reversed(ASSOCIATIONS):
+        op.drop_index(f'ix_{table}_{column}', table_name=table)
+        op.drop_constraint(f'pk_{table}', table, type_='primary')
+        op.alter_column(table, column, existing_type=sa.String(length=36), nullable=True)
+        op.alter_column(table, 'blog_id', existing_type=sa.String(length=36), nullable=True)
+
+    op.drop_index('ix_comments_parent_id', table_name='comments')
+    op.drop_index('ix_comments_blog_id_parent_id_created_at', table_name='comments')
+    op.drop_index('ix_blogs_author_id_created_at', table_name='blogs')
+    op.drop_index('ix_blogs_is_draft_created_at', table_name='blogs')
@@ -0,0 +1,30 @@
+"""blog sort indexes
+
+Revision ID: 66ce4c362ae2
+Revises:
+Create Date: 2026-10-19 10:02:11.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '66ce4c362ae2'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_blogs_is_draft_view_count', 'blogs', ['is_draft', 'view_count', 'id'], unique=False)
+    op.create_index('ix_blogs_is_draft_like_count', 'blogs', ['is_draft', 'like_count', 'id'], unique=False)
+    op.create_index('ix_blogs_is_draft_updated_at', 'blogs', ['is_draft', 'updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_blogs_is_draft_updated_at', table_name='blogs')
+    op.drop_index('ix_blogs_is_draft_like_count', table_name='blogs')
+    op.drop_index('ix_blogs_is_draft_view_count', table_name='blogs')
@@ -0,0 +1,41 @@
+"""comment thread id
+
+Revision ID: bd29bfad4bb6
+Revises: 2f1e98f81b3d
+Create Date: 2026-10-19 11:42:08.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bd29bfad4bb6'
+down_revision: Union[str, None] = '2f1e98f81b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('comments', sa.Column('thread_id', sa.String(length=36), nullable=True))
+
+    # 以遞迴 CTE 找出每則評論所屬討論串的根評論
+    op.execute(
+        "UPDATE comments JOIN ("
+        "WITH RECURSIVE threads (id, root_id) AS ("
+        "SELECT id, id FROM comments WHERE parent_id IS NULL "
+        "UNION ALL "
+        "SELECT c.id, t.root_id FROM comments c JOIN threads t ON c.parent_id = t.id"
+        ") SELECT id, root_id FROM threads"
+        ") AS resolved ON resolved.id = comments.id "
+        "SET comments.thread_id = resolved.root_id"
+    )
+
+    op.create_index('ix_comments_thread_id_created_at', 'comments', ['thread_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comments_thread_id_created_at', table_name='comments')
+    op.drop_column('comments', 'thread_id')
@@ -0,0 +1,37 @@
+"""blog comment stats
+
+Revision ID: eed1fde6d232
+Revises: 20b2da33b4c2
+Create Date: 2026-10-19 13:02:51.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'eed1fde6d232'
+down_revision: Union[str, None] = '20b2da33b4c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('blogs', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('blogs', sa.Column('last_comment_at', sa.DateTime(), nullable=True))
+
+    # 以現有資料初始化評論數與最後評論時間
+    op.execute(
+        "UPDATE blogs JOIN ("
+        "SELECT blog_id, COUNT(*) AS total, MAX(created_at) AS latest FROM comments GROUP BY blog_id"
+        ") AS stats ON stats.blog_id = blogs.id "
+        "SET blogs.comment_count = stats.total, blogs.last_comment_at = stats.latest, "
+        "blogs.updated_at = blogs.updated_at"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('blogs', 'last_comment_at')
+    op.drop_column('blogs', 'comment_count')
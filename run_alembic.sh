@@ -1,10 +1,14 @@
 #!/bin/bash
 
+# 套用 alembic/versions 中尚未執行的 migration，不會刪除既有的版本檔
+# 修改 models 後如需新的 migration，執行 `bash run_alembic.sh revision "<說明>"` 自動產生，檢查內容後再提交
+
 # shellcheck disable=SC2164
 cd /run
 
-rm /run/alembic/versions/*.py
+if [ "$1" = "revision" ]; then
+    current_date=$(date +"%Y-%m-%d %H:%M:%S")
+    alembic revision --autogenerate -m "${2:-revision generated on ${current_date}}"
+fi
 
-current_date=$(date +"%Y-%m-%d %H:%M:%S")
-alembic revision --autogenerate -m "revision generated on ${current_date}"
 alembic upgrade head
@@ -0,0 +1,219 @@
+"""
+比較 async session 與 thread pool 在高併發下的吞吐量
+
+以相同的 CRUD (公開文章列表) 建立三個路由，於獨立行程啟動 uvicorn 後以 httpx 模擬多個客戶端:
+
+- async: async def 路由，透過 AsyncSession (src/crud/aio) 查詢，不阻塞事件迴圈
+- threadpool: def 路由，由 FastAPI 的 thread pool 以同步 Session 查詢
+- blocking: async def 路由直接呼叫同步 Session (改用 async engine 前的寫法)，查詢期間事件迴圈被阻塞
+
+預設使用 DB_* 環境變數設定的資料庫 (與應用程式相同)，於容器中執行:
+
+    python3.11 -m scripts.bench_concurrency --clients 200 --duration 10
+
+未連接 MySQL 時可以 --database-url 指定 SQLite 檔案試跑 (--seed 建立測試資料)。SQLite 沒有網路往返，
+--latency-ms 會在執行查詢的執行緒中 (aiosqlite 為其背景執行緒) 暫停指定時間，模擬資料庫的往返延遲
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import time
+from typing import Dict, List
+
+import httpx
+
+ROUTES = ("async", "threadpool", "blocking")
+
+
+def build_app(session_factory, async_session_factory, limit: int):
+    from typing import List as ListType
+
+    from fastapi import FastAPI
+
+    from src.crud import aio, blog as blog_crud
+    from src.schemas import blog as schemas
+
+    app = FastAPI()
+
+    @app.get("/async", response_model=ListType[schemas.BlogSummary])
+    async def async_route():
+        async with async_session_factory() as db:
+            return await aio.blog.get_blogs(db, limit=limit)
+
+    @app.get("/threadpool", response_model=ListType[schemas.BlogSummary])
+    def threadpool_route():
+        with session_factory() as db:
+            return blog_crud.get_blogs(db, limit=limit)
+
+    @app.get("/blocking", response_model=ListType[schemas.BlogSummary])
+    async def blocking_route():
+        with session_factory() as db:
+            return blog_crud.get_blogs(db, limit=limit)
+
+    return app
+
+
+def get_session_factories(database_url: str = None, seed: int = 0, latency_ms: float = 0):
+    if not database_url:
+        from src.database.database import database
+
+        return database.SessionLocal, database.AsyncSessionLocal
+
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.util import await_only
+
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(database_url.replace("sqlite://", "sqlite+aiosqlite://"))
+    if seed:
+        _seed(engine, seed)
+
+    if latency_ms:
+        def delay(statement):
+            time.sleep(latency_ms / 1000)
+
+        @event.listens_for(engine, "connect")
+        def add_delay(dbapi_connection, connection_record):
+            dbapi_connection.set_trace_callback(delay)
+
+        @event.listens_for(async_engine.sync_engine, "connect")
+        def add_async_delay(dbapi_connection, connection_record):
+            # sqlite3 連線只能在 aiosqlite 的背景執行緒中設定
+            connection = dbapi_connection.driver_connection
+            await_only(connection._execute(connection._conn.set_trace_callback, delay))
+
+    return (
+        sessionmaker(autoflush=False, bind=engine),
+        async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    )
+
+
+def _seed(engine, count: int) -> None:
+    from sqlalchemy.orm import Session
+    from ulid import ULID
+
+    from src.database import models
+
+    models.Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        if db.query(models.Blog.id).first() is not None:
+            return
+
+        user = models.User(id=str(ULID()), name="bench")
+        tags = [models.Tag(id=str(ULID()), name=f"tag{i}") for i in range(3)]
+        categories = [models.Category(id=str(ULID()), name=f"category{i}") for i in range(2)]
+        db.add_all([user, *tags, *categories])
+        db.add_all([
+            models.Blog(
+                id=str(ULID()),
+                title=f"title {i}",
+                content="content",
+                summary="summary",
+                is_draft=False,
+                author_id=user.id,
+                tags=tags,
+                categories=categories
+            )
+            for i in range(count)
+        ])
+        db.commit()
+
+
+def serve(port: int, limit: int, database_url: str, seed: int, latency_ms: float) -> None:
+    import uvicorn
+
+    session_factory, async_session_factory = get_session_factories(database_url, seed, latency_ms)
+    app = build_app(session_factory, async_session_factory, limit)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", loop="uvloop", http="httptools")
+
+
+def wait_for_port(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f"Server did not start on port {port}")
+
+
+async def run_load(url: str, clients: int, duration: float) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code != 200:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else 0.0
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200, help="同時連線的客戶端數")
+    parser.add_argument("--duration", type=float, default=10, help="每個路由的測試秒數")
+    parser.add_argument("--warmup", type=float, default=2, help="正式測試前的暖機秒數")
+    parser.add_argument("--limit", type=int, default=10, help="每次查詢的文章數")
+    parser.add_argument("--port", type=int, default=8199)
+    parser.add_argument("--routes", default=",".join(ROUTES), help=f"要測試的路由: {','.join(ROUTES)}")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"), help="改用指定的資料庫 (例如 sqlite:///bench.db)")
+    parser.add_argument("--seed", type=int, default=0, help="資料庫沒有文章時建立的測試文章數")
+    parser.add_argument("--latency-ms", type=float, default=0, help="搭配 --database-url，每個查詢模擬的往返延遲")
+    args = parser.parse_args()
+
+    server = multiprocessing.Process(
+        target=serve,
+        args=(args.port, args.limit, args.database_url, args.seed, args.latency_ms),
+        daemon=True
+    )
+    server.start()
+    try:
+        wait_for_port(args.port)
+
+        print(f"clients={args.clients} duration={args.duration}s limit={args.limit} latency={args.latency_ms}ms")
+        print(f"{'route':<12}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for route in args.routes.split(","):
+            url = f"http://127.0.0.1:{args.port}/{route}"
+            asyncio.run(run_load(url, args.clients, args.warmup))
+            result = asyncio.run(run_load(url, args.clients, args.duration))
+            print(
+                f"{route:<12}{result['requests']:>10}{result['errors']:>8}{result['rps']:>10.1f}"
+                f"{result['p50']:>10.1f}{result['p95']:>10.1f}{result['p99']:>10.1f}"
+            )
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
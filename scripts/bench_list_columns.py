@@ -0,0 +1,168 @@
+"""
+量測文章列表不載入 content 欄位所省下的資料量、記憶體與時間
+
+以相同的條件 (已發布、最新排序、--limit 篇) 查詢文章列表，比較兩種載入方式:
+
+- full: 載入整個 Blog 實體 (包含 content)，改用 BLOG_SUMMARY_LOADERS 前的寫法
+- summary: 目前的 blog_crud.get_blogs，以 defer 略過 content
+
+回報主查詢傳回的資料量 (各欄位值的位元組數總和)、每次查詢 (含物件建立) 的記憶體峰值與耗時的中位數。
+
+預設使用 DB_* 環境變數設定的資料庫 (與應用程式相同)，於容器中執行:
+
+    python3.11 -m scripts.bench_list_columns --limit 100
+
+未連接 MySQL 時可以 --database-url 指定 SQLite 檔案試跑，--seed 建立指定數量、內容為 --content-bytes 大小的文章:
+
+    python -m scripts.bench_list_columns --database-url sqlite:///bench_columns.db --seed 200
+"""
+import argparse
+import os
+import statistics
+import time
+import tracemalloc
+from typing import Dict, List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, selectinload
+
+
+def load_full(db: Session, limit: int) -> List:
+    from src.database import models
+
+    return db.query(models.Blog).join(models.User).options(
+        selectinload(models.Blog.author),
+        selectinload(models.Blog.tags),
+        selectinload(models.Blog.categories),
+    ).filter(
+        models.Blog.is_draft == False
+    ).order_by(
+        models.Blog.created_at.desc(), models.Blog.id.desc()
+    ).limit(limit).all()
+
+
+def load_summary(db: Session, limit: int) -> List:
+    from src.crud import blog as blog_crud
+
+    return blog_crud.get_blogs(db, limit=limit)
+
+
+VARIANTS = {
+    "full": load_full,
+    "summary": load_summary,
+}
+
+
+def seed(engine, count: int, content_bytes: int) -> None:
+    from ulid import ULID
+
+    from src.database import models
+
+    models.Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        if db.query(models.Blog.id).first() is not None:
+            return
+
+        user = models.User(id=str(ULID()), name="bench")
+        tags = [models.Tag(id=str(ULID()), name=f"tag{i}") for i in range(3)]
+        categories = [models.Category(id=str(ULID()), name=f"category{i}") for i in range(2)]
+        db.add_all([user, *tags, *categories])
+        db.add_all([
+            models.Blog(
+                id=str(ULID()),
+                title=f"title {i}",
+                content="x" * content_bytes,
+                summary="summary",
+                is_draft=False,
+                author_id=user.id,
+                tags=tags,
+                categories=categories
+            )
+            for i in range(count)
+        ])
+        db.commit()
+
+
+def row_bytes(engine, statement: str, parameters) -> int:
+    """
+    重新執行主查詢並加總各欄位值的大小，近似資料庫傳回的資料量
+    """
+    total = 0
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(statement, parameters)
+        for row in cursor.fetchall():
+            for value in row:
+                if value is not None:
+                    total += len(value) if isinstance(value, (str, bytes)) else len(str(value))
+        cursor.close()
+    finally:
+        connection.close()
+    return total
+
+
+def measure(engine, variant: str, limit: int, rounds: int) -> Dict[str, float]:
+    loader = VARIANTS[variant]
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with Session(engine) as db:
+            loader(db, limit)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    # 第一個查詢即文章主查詢，其後為關聯的 selectin 查詢
+    statement, parameters = next((s, p) for s, p in statements if "FROM blogs" in s)
+    size = row_bytes(engine, statement, parameters)
+
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        with Session(engine) as db:
+            loader(db, limit)
+        durations.append((time.perf_counter() - start) * 1000)
+
+    # tracemalloc 會拖慢執行，與計時分開量測
+    peaks = []
+    for _ in range(rounds):
+        tracemalloc.start()
+        with Session(engine) as db:
+            loader(db, limit)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+
+    return {"bytes": size, "peak_kib": statistics.median(peaks), "ms": statistics.median(durations)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=100, help="每次查詢的文章數")
+    parser.add_argument("--rounds", type=int, default=20, help="每種方式重複的次數，回報中位數")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"), help="改用指定的資料庫 (例如 sqlite:///bench.db)")
+    parser.add_argument("--seed", type=int, default=0, help="資料庫沒有文章時建立的測試文章數")
+    parser.add_argument("--content-bytes", type=int, default=5000, help="建立的測試文章的內容大小")
+    args = parser.parse_args()
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+    else:
+        from src.database.database import database
+
+        engine = database.engine
+    if args.seed:
+        seed(engine, args.seed, args.content_bytes)
+
+    print(f"limit={args.limit} rounds={args.rounds}")
+    print(f"{'variant':<10}{'row bytes':>12}{'peak KiB':>12}{'ms':>10}")
+    for variant in VARIANTS:
+        result = measure(engine, variant, args.limit, args.rounds)
+        print(f"{variant:<10}{result['bytes']:>12}{result['peak_kib']:>12.1f}{result['ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+比較連線驗證方式對每個請求延遲的影響
+
+每個請求從連線池取出一條連線、執行一個查詢後歸還，依序重複 --requests 次，回報延遲與 ping 次數:
+
+- none: 不驗證連線
+- pre_ping: pool_pre_ping，每次取出都送出 ping (移除前的設定)
+- idle_ping: install_idle_ping，只驗證閒置超過 --idle-seconds 的連線 (目前的設定)
+
+預設使用 DB_* 環境變數設定的資料庫 (與應用程式相同)，於容器中執行:
+
+    python3.11 -m scripts.bench_ping --requests 2000
+
+未連接 MySQL 時可以 --database-url 指定 SQLite 檔案試跑，--latency-ms 會在每個語句 (包含 ping 的 SELECT 1) 前暫停指定時間，
+模擬資料庫的往返延遲。--gap-ms 為請求之間的間隔，搭配較小的 --idle-seconds 可觀察閒置連線被驗證的情形
+"""
+import argparse
+import os
+import statistics
+import time
+from typing import Dict, List
+
+from sqlalchemy import create_engine, event, text
+
+MODES = ("none", "pre_ping", "idle_ping")
+
+
+def build_engine(database_url: str, mode: str, idle_seconds: float, latency_ms: float):
+    from src.database.database import READ_ONLY_SETTINGS
+    from src.database.ping import install_idle_ping
+
+    # 使用唯讀連線池的設定，歸還時不送出 ROLLBACK，延遲差異只來自連線驗證
+    engine = create_engine(database_url, pool_pre_ping=mode == "pre_ping", **READ_ONLY_SETTINGS)
+    if mode == "idle_ping":
+        install_idle_ping(engine, idle_seconds)
+
+    if latency_ms and engine.dialect.name == "sqlite":
+        def delay(statement):
+            time.sleep(latency_ms / 1000)
+
+        @event.listens_for(engine, "connect")
+        def add_delay(dbapi_connection, connection_record):
+            dbapi_connection.set_trace_callback(delay)
+
+    # 計算實際送出的 ping 次數
+    pings = {"count": 0}
+    do_ping = engine.dialect.do_ping
+
+    def counting_ping(dbapi_connection):
+        pings["count"] += 1
+        return do_ping(dbapi_connection)
+
+    engine.dialect.do_ping = counting_ping
+    return engine, pings
+
+
+def run(engine, requests: int, gap_ms: float) -> List[float]:
+    latencies: List[float] = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1")).scalar()
+        latencies.append((time.perf_counter() - start) * 1000)
+        if gap_ms:
+            time.sleep(gap_ms / 1000)
+    return latencies
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    latencies = sorted(latencies)
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+    return {
+        "mean": statistics.mean(latencies),
+        "p50": percentile(0.50),
+        "p99": percentile(0.99),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="每種方式的請求數")
+    parser.add_argument("--warmup", type=int, default=50, help="正式測試前的暖機請求數")
+    parser.add_argument("--gap-ms", type=float, default=0, help="請求之間的間隔")
+    parser.add_argument("--idle-seconds", type=float, default=None, help="idle_ping 的閒置門檻 (預設為 DB_PING_IDLE_SECONDS)")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"要比較的方式: {','.join(MODES)}")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"), help="改用指定的資料庫 (例如 sqlite:///bench.db)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="搭配 SQLite，每個語句模擬的往返延遲")
+    args = parser.parse_args()
+
+    from src.database.database import SQLALCHEMY_DATABASE_URL
+    from src.database.ping import DB_PING_IDLE_SECONDS
+
+    database_url = args.database_url or SQLALCHEMY_DATABASE_URL
+    idle_seconds = DB_PING_IDLE_SECONDS if args.idle_seconds is None else args.idle_seconds
+
+    print(
+        f"requests={args.requests} gap={args.gap_ms}ms idle_seconds={idle_seconds} latency={args.latency_ms}ms"
+    )
+    print(f"{'mode':<12}{'pings':>8}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for mode in args.modes.split(","):
+        engine, pings = build_engine(database_url, mode, idle_seconds, args.latency_ms)
+        try:
+            run(engine, args.warmup, args.gap_ms)
+            pings["count"] = 0
+            result = summarize(run(engine, args.requests, args.gap_ms))
+        finally:
+            engine.dispose()
+        print(
+            f"{mode:<12}{pings['count']:>8}{result['mean']:>10.3f}{result['p50']:>10.3f}{result['p99']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+量測文章列表回應的序列化成本與大小
+
+以 --items 篇文章 (預設 100，即 /public/blogs?limit=100) 建立 BlogSummary 列表，每種方式重複 --rounds 次，
+回報每個回應的 CPU 時間 (中位數) 與輸出大小:
+
+formats: 已驗證的 BlogSummary 列表轉為回應內容
+- json: pydantic-core dump_json，FastAPI 在 response_model 搭配預設回應類別時的路徑
+- dict+json: 先轉為 dict 再以標準函式庫 json 編碼 (自訂回應類別時的路徑)
+- msgpack: MessagePackMiddleware 的路徑，將 dump_json 的結果解析後以 MessagePack 重新編碼
+
+responses: 由 ORM 物件建立回應並序列化為 JSON (文章列表與使用者列表)
+- converter: 改用 from_attributes 前的寫法，逐欄位建立模型，author_name / username 為一般欄位
+- from_attributes: 目前的寫法，由 ORM 物件直接驗證，author_name / username 為 computed_field
+
+不需資料庫，直接執行:
+
+    python -m scripts.bench_serialization --items 100 --rounds 200
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import msgpack
+from pydantic import BaseModel, TypeAdapter
+
+
+class LegacyBlogSummary(BaseModel):
+    """
+    改用 from_attributes 前的 BlogSummary，由路由逐欄位轉換
+    """
+
+    id: str
+    title: str
+    summary: Optional[str] = None
+    cover_image_url: Optional[str] = None
+    created_at: datetime
+    view_count: int
+    like_count: int
+    comment_count: int = 0
+    last_comment_at: Optional[datetime] = None
+    author_name: str
+    tags: List[str] = []
+    categories: List[str] = []
+
+
+class LegacyUserDetail(BaseModel):
+    """
+    改用 from_attributes 前的 UserDetail
+    """
+
+    id: str
+    name: str
+    username: str
+    bio: Optional[str] = None
+    avatar_url: Optional[str] = None
+    created_at: datetime
+
+
+def build_blogs(count: int) -> List:
+    """
+    建立與列表查詢結果相同結構的 ORM 物件 (作者、標籤與分類已載入)
+    """
+    from src.database import models
+
+    author = models.User(id="01HZX0000000000000000AUTHR", name="bench author")
+    tags = [models.Tag(id=f"01HZX00000000000000000TAG{i}", name=f"tag{i}") for i in range(3)]
+    categories = [models.Category(id=f"01HZX0000000000000000CATE{i}", name=f"category{i}") for i in range(2)]
+    created_at = datetime(2024, 1, 1)
+
+    return [
+        models.Blog(
+            id=f"01HZX{i:021d}",
+            title=f"Blog title {i}",
+            summary="A short summary of the blog post that is shown in the list view.",
+            cover_image_url=f"https://example.com/covers/{i}.jpg",
+            created_at=created_at + timedelta(minutes=i),
+            view_count=i * 7,
+            like_count=i * 3,
+            comment_count=i % 5,
+            last_comment_at=created_at + timedelta(hours=i),
+            author=author,
+            tags=tags,
+            categories=categories
+        )
+        for i in range(count)
+    ]
+
+
+def build_users(count: int) -> List:
+    from src.database import models
+
+    created_at = datetime(2024, 1, 1)
+    return [
+        models.User(
+            id=f"01HZX{i:021d}",
+            name=f"user {i}",
+            bio="A short biography.",
+            avatar_url=f"https://example.com/avatars/{i}.jpg",
+            created_at=created_at + timedelta(minutes=i),
+            account=models.UserAccount(id=f"01HZY{i:021d}", username=f"username{i}")
+        )
+        for i in range(count)
+    ]
+
+
+def cpu_per_call(func: Callable[[], bytes], rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.process_time()
+        func()
+        samples.append((time.process_time() - start) * 1_000_000)
+    return statistics.median(samples)
+
+
+def format_benchmarks(count: int) -> Dict[str, Callable[[], bytes]]:
+    from src.schemas.blog import BlogSummary
+
+    adapter = TypeAdapter(List[BlogSummary])
+    items = adapter.validate_python(build_blogs(count), from_attributes=True)
+
+    def dict_json() -> bytes:
+        content = adapter.dump_python(items, mode="json")
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+    return {
+        "json": lambda: adapter.dump_json(items),
+        "dict+json": dict_json,
+        "msgpack": lambda: msgpack.packb(json.loads(adapter.dump_json(items))),
+    }
+
+
+def response_benchmarks(count: int) -> Dict[str, Callable[[], bytes]]:
+    from src.schemas.blog import BlogSummary, UserDetail
+
+    blogs = build_blogs(count)
+    users = build_users(count)
+    blog_adapter = TypeAdapter(List[BlogSummary])
+    user_adapter = TypeAdapter(List[UserDetail])
+    legacy_blog_adapter = TypeAdapter(List[LegacyBlogSummary])
+    legacy_user_adapter = TypeAdapter(List[LegacyUserDetail])
+
+    def blogs_converter() -> bytes:
+        return legacy_blog_adapter.dump_json([
+            LegacyBlogSummary(
+                id=blog.id,
+                title=blog.title,
+                summary=blog.summary,
+                cover_image_url=blog.cover_image_url,
+                created_at=blog.created_at,
+                view_count=blog.view_count,
+                like_count=blog.like_count,
+                comment_count=blog.comment_count or 0,
+                last_comment_at=blog.last_comment_at,
+                author_name=blog.author.name,
+                tags=[tag.name for tag in blog.tags],
+                categories=[category.name for category in blog.categories]
+            )
+            for blog in blogs
+        ])
+
+    def users_converter() -> bytes:
+        return legacy_user_adapter.dump_json([
+            LegacyUserDetail(
+                id=user.id,
+                name=user.name,
+                username=user.account.username,
+                bio=user.bio,
+                avatar_url=user.avatar_url,
+                created_at=user.created_at
+            )
+            for user in users
+        ])
+
+    return {
+        "blogs converter": blogs_converter,
+        "blogs from_attributes": lambda: blog_adapter.dump_json(blog_adapter.validate_python(blogs, from_attributes=True)),
+        "users converter": users_converter,
+        "users from_attributes": lambda: user_adapter.dump_json(user_adapter.validate_python(users, from_attributes=True)),
+    }
+
+
+BENCHMARKS = {
+    "formats": format_benchmarks,
+    "responses": response_benchmarks,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100, help="每個回應的文章數")
+    parser.add_argument("--rounds", type=int, default=200, help="每種方式重複的次數，回報中位數")
+    parser.add_argument("--benchmarks", default=",".join(BENCHMARKS), help=f"要執行的項目: {','.join(BENCHMARKS)}")
+    args = parser.parse_args()
+
+    print(f"items={args.items} rounds={args.rounds}")
+    for name in args.benchmarks.split(","):
+        print(f"\n[{name}]")
+        print(f"{'method':<24}{'cpu us':>10}{'bytes':>10}")
+        for method, func in BENCHMARKS[name](args.items).items():
+            size = len(func())
+            print(f"{method:<24}{cpu_per_call(func, args.rounds):>10.0f}{size:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+比較正式環境啟動程式 (python -m src.serve) 與開發模式 (fastapi run --reload) 在高併發下的吞吐量
+
+兩種模式依序以獨立行程啟動完整的應用程式 (src.server:app)，再以 httpx 模擬多個客戶端請求 --path:
+
+- dev: docker-compose.yaml 的啟動指令，單一 worker 並監看檔案變更
+- prefork: docker-compose.prod.yaml 的啟動指令，主行程載入後 fork 出 --workers 個 worker (uvloop、httptools)
+
+預設使用 DB_* 環境變數設定的資料庫 (與應用程式相同)，於容器中執行:
+
+    python3.11 -m scripts.bench_serve --workers 4 --clients 200 --duration 10 --path /public/blogs
+
+未連接資料庫時以不需資料庫的路徑試跑 (例如 --path /)
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+
+from scripts.bench_concurrency import run_load, wait_for_port
+
+MODES = ("dev", "prefork")
+
+
+def start_server(mode: str, port: int, workers: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    if mode == "dev":
+        env["DEV"] = "true"
+        command = [
+            sys.executable, "-m", "fastapi", "run", "src/server.py",
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--reload",
+        ]
+    else:
+        env.update({
+            "DEV": "false",
+            "SERVER_HOST": "127.0.0.1",
+            "SERVER_PORT": str(port),
+            "WEB_CONCURRENCY": str(workers),
+        })
+        command = [sys.executable, "-m", "src.serve"]
+
+    return subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200, help="同時連線的客戶端數")
+    parser.add_argument("--duration", type=float, default=10, help="每種模式的測試秒數")
+    parser.add_argument("--warmup", type=float, default=2, help="正式測試前的暖機秒數")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="prefork 模式的 worker 數")
+    parser.add_argument("--path", default="/public/blogs", help="請求的路徑")
+    parser.add_argument("--port", type=int, default=8197)
+    parser.add_argument("--modes", default=",".join(MODES), help=f"要比較的模式: {','.join(MODES)}")
+    args = parser.parse_args()
+
+    print(f"clients={args.clients} duration={args.duration}s workers={args.workers} path={args.path}")
+    print(f"{'mode':<12}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for mode in args.modes.split(","):
+        server = start_server(mode, args.port, args.workers)
+        try:
+            wait_for_port(args.port, timeout=60)
+            url = f"http://127.0.0.1:{args.port}{args.path}"
+            asyncio.run(run_load(url, args.clients, args.warmup))
+            result = asyncio.run(run_load(url, args.clients, args.duration))
+            print(
+                f"{mode:<12}{result['requests']:>10}{result['errors']:>8}{result['rps']:>10.1f}"
+                f"{result['p50']:>10.1f}{result['p95']:>10.1f}{result['p99']:>10.1f}"
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+量測冷啟動時間: 匯入時間、啟動到可回應的時間與第一個請求的延遲
+
+每一輪以新的行程啟動 uvicorn (單一 worker)，持續請求 --path 直到收到回應:
+
+- import: 新的直譯器中匯入 src.server 的時間 (src.server.IMPORT_MS)
+- ready: 從啟動行程到收到第一個回應的時間，包含直譯器啟動、匯入、lifespan (資料庫初始化與預熱)
+- first: 第一個成功送達的請求本身的延遲 (冷的連線池、尚未快取的路由與序列化器)
+- second: 緊接著的第二個請求的延遲，作為比較
+
+於容器中執行 (使用 DB_* 環境變數設定的資料庫):
+
+    python3.11 -m scripts.bench_startup --rounds 5 --path /public/blogs
+
+以 --output 將結果附加至 JSON Lines 檔案，便於追蹤每次修改後的變化
+"""
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import httpx
+
+
+def measure_import() -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", "import src.server as server; print(server.IMPORT_MS)"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure_startup(port: int, path: str, timeout: float) -> Dict[str, float]:
+    command = [
+        sys.executable, "-m", "uvicorn", "src.server:app",
+        "--host", "127.0.0.1",
+        "--port", str(port),
+        "--loop", "uvloop",
+        "--http", "httptools",
+        "--log-level", "warning",
+    ]
+    started = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        url = f"http://127.0.0.1:{port}{path}"
+        deadline = started + timeout
+        with httpx.Client(timeout=timeout) as client:
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f"Server exited with status {process.returncode}")
+                if time.perf_counter() > deadline:
+                    raise RuntimeError(f"Server did not respond within {timeout}s")
+
+                # 埠尚未開啟時不送出請求，以免把連線失敗算進第一個請求的延遲
+                with socket.socket() as sock:
+                    if sock.connect_ex(("127.0.0.1", port)) != 0:
+                        time.sleep(0.005)
+                        continue
+
+                request_started = time.perf_counter()
+                try:
+                    response = client.get(url)
+                except httpx.TransportError:
+                    time.sleep(0.005)
+                    continue
+                finished = time.perf_counter()
+                break
+
+            second_started = time.perf_counter()
+            client.get(url)
+            second_ms = (time.perf_counter() - second_started) * 1000
+
+        return {
+            "status": response.status_code,
+            "ready_ms": (finished - started) * 1000,
+            "first_ms": (finished - request_started) * 1000,
+            "second_ms": second_ms,
+        }
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5, help="重複啟動的次數，回報中位數")
+    parser.add_argument("--path", default="/public/blogs", help="第一個請求的路徑")
+    parser.add_argument("--port", type=int, default=8198)
+    parser.add_argument("--timeout", type=float, default=60, help="等待伺服器回應的秒數")
+    parser.add_argument("--output", help="將結果附加至此 JSON Lines 檔案")
+    args = parser.parse_args()
+
+    rounds: List[Dict[str, float]] = []
+    for _ in range(args.rounds):
+        result = measure_startup(args.port, args.path, args.timeout)
+        result["import_ms"] = measure_import()
+        rounds.append(result)
+
+    summary = {
+        key: round(statistics.median(result[key] for result in rounds), 1)
+        for key in ("import_ms", "ready_ms", "first_ms", "second_ms")
+    }
+    statuses = sorted({result["status"] for result in rounds})
+
+    print(f"path={args.path} rounds={args.rounds} status={statuses}")
+    print(f"{'':<8}{'import':>10}{'ready':>10}{'first':>10}{'second':>10}")
+    print(
+        f"{'median':<8}{summary['import_ms']:>10.1f}{summary['ready_ms']:>10.1f}"
+        f"{summary['first_ms']:>10.1f}{summary['second_ms']:>10.1f}  (ms)"
+    )
+
+    if args.output:
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "revision": git_revision(),
+            "path": args.path,
+            "rounds": args.rounds,
+            "status": statuses,
+            **summary,
+        }
+        with open(args.output, "a") as file:
+            file.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
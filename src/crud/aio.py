@@ -0,0 +1,34 @@
+from types import ModuleType
+from typing import Any, Callable, Coroutine
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.crud import blog as blog_crud, comment as comment_crud, taxonomy as taxonomy_crud, user as user_crud
+
+
+class AsyncCrud:
+    """
+    將同步 CRUD 模組包裝為 async 版本
+
+    每個函數透過 AsyncSession.run_sync 執行，既有的 CRUD 邏輯與 handle_error 不需改寫，
+    但 SQL I/O 改由 async driver 執行，不再阻塞事件迴圈。
+    回傳的物件需在 CRUD 中以 loader 預先載入所需關聯，run_sync 之外無法 lazy load。
+    """
+
+    def __init__(self, module: ModuleType):
+        self._module = module
+
+    def __getattr__(self, name: str) -> Callable[..., Coroutine[Any, Any, Any]]:
+        func = getattr(self._module, name)
+
+        async def wrapper(db: AsyncSession, *args, **kwargs):
+            return await db.run_sync(func, *args, **kwargs)
+
+        wrapper.__name__ = name
+        return wrapper
+
+
+blog = AsyncCrud(blog_crud)
+comment = AsyncCrud(comment_crud)
+taxonomy = AsyncCrud(taxonomy_crud)
+user = AsyncCrud(user_crud)
@@ -1,11 +1,72 @@
-from typing import Type, List, Optional, Dict, Any
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Iterable
 
-from sqlalchemy import func, desc
-from sqlalchemy.orm import Session, joinedload
+from fastapi import HTTPException, status
+from sqlalchemy import desc, and_, or_, text, DateTime
+from sqlalchemy.orm import Session, selectinload, defer, load_only, raiseload
 from ulid import ULID
 
+from src.crud import taxonomy as taxonomy_crud
 from src.database import models
-from src.utils.handler import handle_error, handle_none_value
+from src.schemas.blog import BlogSortOrder
+from src.utils.handler import handle_error, handle_none_value, retry_on_disconnect
+from src.utils.pagination import Total, encode_cursor, decode_cursor
+
+# 各排序方式對應的欄位，皆有 (is_draft, 欄位) 複合索引支援
+BLOG_SORT_COLUMNS = {
+    BlogSortOrder.LATEST.value: models.Blog.created_at,
+    BlogSortOrder.MOST_VIEWED.value: models.Blog.view_count,
+    BlogSortOrder.MOST_LIKED.value: models.Blog.like_count,
+    BlogSortOrder.RECENTLY_UPDATED.value: models.Blog.updated_at,
+}
+
+# 各端點的預載入設定，以 selectinload 批次載入關聯，避免逐筆 lazy load
+# 列表 (BlogSummary): 作者名稱、標籤與分類，每頁固定 4 次查詢
+# 摘要不含 content，延遲載入並在意外存取時直接報錯，避免逐筆補查大型內文
+BLOG_SUMMARY_LOADERS = (
+    defer(models.Blog.content, raiseload=True),
+    selectinload(models.Blog.author),
+    selectinload(models.Blog.tags),
+    selectinload(models.Blog.categories),
+)
+
+# 詳情 (BlogDetail): 另需作者帳號以取得 username
+BLOG_DETAIL_LOADERS = (
+    selectinload(models.Blog.author).selectinload(models.User.account),
+    selectinload(models.Blog.tags),
+    selectinload(models.Blog.categories),
+)
+
+# fields= 稀疏欄位中需要關聯的欄位，及其預載入方式與所需的外鍵
+BLOG_FIELD_LOADERS = {
+    "author_name": (selectinload(models.Blog.author).load_only(models.User.name), models.Blog.author_id),
+    "author": (selectinload(models.Blog.author).selectinload(models.User.account), models.Blog.author_id),
+    "tags": (selectinload(models.Blog.tags), None),
+    "categories": (selectinload(models.Blog.categories), None),
+}
+
+
+def get_blog_loaders(fields: Optional[Iterable[str]], default_loaders: tuple, *required_columns) -> tuple:
+    """
+    依 fields 只查詢需要的欄位並只預載入需要的關聯，未指定 fields 時使用端點預設的 loader
+
+    id 與 is_draft (草稿檢查) 一律載入；未選取的欄位與關聯被存取時直接報錯，不會補查
+    """
+    if not fields:
+        return default_loaders
+
+    columns = {models.Blog.id, models.Blog.is_draft, *required_columns}
+    loaders = []
+    for name in fields:
+        if name in BLOG_FIELD_LOADERS:
+            loader, foreign_key = BLOG_FIELD_LOADERS[name]
+            loaders.append(loader)
+            if foreign_key is not None:
+                columns.add(foreign_key)
+        elif name in models.Blog.__table__.columns:
+            columns.add(getattr(models.Blog, name))
+
+    return (load_only(*columns, raiseload=True), *loaders, raiseload("*"))
 
 
 @handle_error
@@ -31,9 +92,6 @@ def create_blog(
         author_id=author_id
     )
     
-    db.add(blog)
-    db.commit()
-    
     # 添加標籤
     if tag_ids:
         tags = db.query(models.Tag).filter(models.Tag.id.in_(tag_ids)).all()
@@ -44,30 +102,43 @@ def create_blog(
         categories = db.query(models.Category).filter(models.Category.id.in_(category_ids)).all()
         blog.categories = categories
     
+    db.add(blog)
+    
+    # 更新標籤與分類的文章數
+    db.flush()
+    taxonomy_crud.refresh_blog_counts(db, tag_ids, category_ids)
+    
     db.commit()
-    db.refresh(blog)
     
-    return blog
+    # 重新查詢以載入詳情頁所需的關聯
+    return get_blog_by_id(db, blog.id)
 
 
 @handle_none_value("Blog")
 @handle_error
-def get_blog_by_id(db: Session, blog_id: str, increment_view: bool = False) -> models.Blog:
-    # 使用joinedload預先載入相關數據，減少數據庫查詢次數
-    blog = db.query(models.Blog).options(
-        joinedload(models.Blog.author),
-        joinedload(models.Blog.tags),
-        joinedload(models.Blog.categories)
-    ).filter(models.Blog.id == blog_id).first()
-    
-    if blog and increment_view:
-        blog.view_count += 1
+def get_blog_by_id(
+        db: Session,
+        blog_id: str,
+        increment_view: bool = False,
+        fields: Optional[Iterable[str]] = None
+) -> models.Blog:
+    # 先以原子操作累加瀏覽次數，避免併發時遺失更新
+    if increment_view:
+        _increment_counter(db, blog_id, models.Blog.view_count)
         db.commit()
     
-    return blog
+    return _get_blog_detail(db, blog_id, fields)
+
+
+@retry_on_disconnect
+def _get_blog_detail(db: Session, blog_id: str, fields: Optional[Iterable[str]] = None) -> Optional[models.Blog]:
+    # 預先載入詳情頁所需的關聯，減少數據庫查詢次數
+    loaders = get_blog_loaders(fields, BLOG_DETAIL_LOADERS)
+    return db.query(models.Blog).options(*loaders).filter(models.Blog.id == blog_id).first()
 
 
 @handle_error
+@retry_on_disconnect
 def get_blogs(
         db: Session,
         skip: int = 0,
@@ -76,9 +147,16 @@ def get_blogs(
         category_id: Optional[str] = None,
         author_id: Optional[str] = None,
         search_term: Optional[str] = None,
-        show_drafts: bool = False
+        show_drafts: bool = False,
+        sort: str = BlogSortOrder.LATEST.value,
+        cursor: Optional[Dict[str, Any]] = None,
+        fields: Optional[Iterable[str]] = None
 ) -> List[models.Blog]:
-    query = db.query(models.Blog).join(models.User)
+    sort_column = BLOG_SORT_COLUMNS[str(sort)]
+    
+    # 指定 fields 時仍需載入排序欄位以產生下一頁的 cursor
+    loaders = get_blog_loaders(fields, BLOG_SUMMARY_LOADERS, sort_column)
+    query = db.query(models.Blog).join(models.User).options(*loaders)
     
     # 根據查詢參數過濾
     if tag_id:
@@ -102,15 +180,95 @@ def get_blogs(
     if not show_drafts:
         query = query.filter(models.Blog.is_draft == False)
     
-    # 按創建時間降序排序
-    query = query.order_by(desc(models.Blog.created_at))
+    # 以 (排序欄位, id) 作為 keyset，從上一頁最後一筆之後開始查詢
+    if cursor:
+        query = query.filter(
+            or_(
+                sort_column < cursor["value"],
+                and_(sort_column == cursor["value"], models.Blog.id < cursor["id"])
+            )
+        )
     
-    # 分頁
-    blogs = query.offset(skip).limit(limit).all()
+    # 按排序欄位降序排序，id 作為相同值時的排序依據
+    query = query.order_by(desc(sort_column), desc(models.Blog.id))
+    
+    # 分頁 (有 cursor 時不使用 offset)
+    if not cursor:
+        query = query.offset(skip)
+    blogs = query.limit(limit).all()
     
     return blogs
 
 
+@handle_error
+@retry_on_disconnect
+def count_blogs(
+        db: Session,
+        tag_id: Optional[str] = None,
+        category_id: Optional[str] = None,
+        author_id: Optional[str] = None,
+        search_term: Optional[str] = None,
+        show_drafts: bool = False
+) -> Optional[Total]:
+    """
+    回傳文章總數，只使用已維護的計數器或估計值，無法低成本取得時回傳 None
+    """
+    if author_id or search_term or show_drafts or (tag_id and category_id):
+        return None
+    
+    if tag_id:
+        return Total(db.query(models.Tag.blog_count).filter(models.Tag.id == tag_id).scalar() or 0)
+    
+    if category_id:
+        return Total(db.query(models.Category.blog_count).filter(models.Category.id == category_id).scalar() or 0)
+    
+    # 未過濾的列表使用 InnoDB 統計資訊的估計列數，包含草稿且可能有誤差，因此標示為估計值
+    # information_schema.TABLES 的 TABLE_ROWS 僅 MySQL 提供，其他資料庫 (例如測試用的 SQLite) 不回傳總數
+    if db.get_bind().dialect.name != "mysql":
+        return None
+    
+    rows = db.execute(text(
+        "SELECT TABLE_ROWS FROM information_schema.TABLES "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"
+    ), {"table_name": models.Blog.__tablename__}).scalar()
+    return Total(rows, estimated=True) if rows is not None else None
+
+
+def encode_blog_cursor(blog: models.Blog, sort: str = BlogSortOrder.LATEST.value) -> str:
+    value = getattr(blog, BLOG_SORT_COLUMNS[str(sort)].key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return encode_cursor({"sort": str(sort), "value": value, "id": blog.id})
+
+
+def decode_blog_cursor(cursor: Optional[str], sort: str = BlogSortOrder.LATEST.value) -> Optional[Dict[str, Any]]:
+    values = decode_cursor(cursor)
+    if values is None:
+        return None
+
+    # cursor 只能搭配產生它時所用的排序方式
+    if values.get("sort") != str(sort):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor does not match sort order")
+
+    try:
+        value = values["value"]
+        if isinstance(BLOG_SORT_COLUMNS[str(sort)].type, DateTime):
+            value = datetime.fromisoformat(value)
+        else:
+            value = int(value)
+        return {"value": value, "id": str(values["id"])}
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _increment_counter(db: Session, blog_id: str, column) -> None:
+    # 計數器更新不應改變 updated_at，否則「最近更新」排序會被瀏覽/按讚打亂
+    db.query(models.Blog).filter(models.Blog.id == blog_id).update(
+        {column: column + 1, models.Blog.updated_at: models.Blog.updated_at},
+        synchronize_session=False
+    )
+
+
 @handle_error
 def update_blog(
         db: Session,
@@ -124,6 +282,10 @@ def update_blog(
     if blog.author_id != author_id:
         return None
     
+    # 記錄原本的標籤與分類，以便更新文章數
+    affected_tag_ids = {tag.id for tag in blog.tags}
+    affected_category_ids = {category.id for category in blog.categories}
+    
     # 更新文章屬性
     for key, value in data.items():
         if key in ['title', 'content', 'summary', 'cover_image_url', 'is_draft']:
@@ -139,10 +301,16 @@ def update_blog(
         categories = db.query(models.Category).filter(models.Category.id.in_(data['category_ids'])).all()
         blog.categories = categories
     
+    # 標籤、分類或發布狀態變更時，更新文章數
+    if {'tag_ids', 'category_ids', 'is_draft'} & data.keys():
+        affected_tag_ids |= {tag.id for tag in blog.tags}
+        affected_category_ids |= {category.id for category in blog.categories}
+        db.flush()
+        taxonomy_crud.refresh_blog_counts(db, affected_tag_ids, affected_category_ids)
+    
     db.commit()
-    db.refresh(blog)
     
-    return blog
+    return get_blog_by_id(db, blog_id)
 
 
 @handle_error
@@ -153,8 +321,13 @@ def delete_blog(db: Session, blog_id: str, author_id: str) -> bool:
     if blog.author_id != author_id:
         return False
     
-    # 刪除文章
+    tag_ids = [tag.id for tag in blog.tags]
+    category_ids = [category.id for category in blog.categories]
+    
+    # 刪除文章並更新標籤與分類的文章數
     db.delete(blog)
+    db.flush()
+    taxonomy_crud.refresh_blog_counts(db, tag_ids, category_ids)
     db.commit()
     
     return True
@@ -162,10 +335,7 @@ def delete_blog(db: Session, blog_id: str, author_id: str) -> bool:
 
 @handle_error
 def like_blog(db: Session, blog_id: str) -> models.Blog:
-    blog = get_blog_by_id(db, blog_id)
-    
-    blog.like_count += 1
+    _increment_counter(db, blog_id, models.Blog.like_count)
     db.commit()
-    db.refresh(blog)
     
-    return blog
+    return get_blog_by_id(db, blog_id)
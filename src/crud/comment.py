@@ -1,10 +1,22 @@
-from typing import List, Optional
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
-from sqlalchemy.orm import Session, joinedload
+from fastapi import HTTPException, status
+from sqlalchemy import func, and_, or_, select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from ulid import ULID
 
 from src.database import models
-from src.utils.handler import handle_error, handle_none_value
+from src.utils.handler import handle_error, handle_none_value, retry_on_disconnect
+from src.utils.pagination import encode_cursor, decode_cursor
+
+# 評論列表 (CommentDetail) 的預載入設定: 評論者及其帳號
+# 回覆不經由關聯載入，而是以 thread_id 一次查出整個討論串後在記憶體中組裝
+COMMENT_LIST_LOADERS = (
+    selectinload(models.Comment.user).selectinload(models.User.account),
+)
 
 
 @handle_error
@@ -20,61 +32,265 @@ def create_comment(
     if comment_id is None:
         comment_id = str(ULID())
     
+    # 回覆沿用父評論所屬的討論串，頂層評論自成一串
+    thread_id = comment_id
+    if parent_id:
+        parent = db.query(models.Comment).filter(models.Comment.id == parent_id).first()
+        if parent is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Parent comment not found")
+        # 回覆必須與父評論屬於同一篇文章，否則會併入其他文章的討論串
+        if parent.blog_id != blog_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Parent comment belongs to a different blog"
+            )
+        thread_id = parent.thread_id or parent.id
+    
     # 創建評論
     comment = models.Comment(
         id=comment_id,
         content=content,
         blog_id=blog_id,
         user_id=user_id,
-        parent_id=parent_id
+        parent_id=parent_id,
+        thread_id=thread_id
     )
     
     db.add(comment)
+    
+    # 更新父評論的回覆數
+    if parent_id:
+        _adjust_reply_count(db, parent_id, 1)
+    
+    # 更新文章的評論數與最後評論時間
+    db.query(models.Blog).filter(models.Blog.id == blog_id).update(
+        {
+            models.Blog.comment_count: models.Blog.comment_count + 1,
+            models.Blog.last_comment_at: func.now(),
+            models.Blog.updated_at: models.Blog.updated_at
+        },
+        synchronize_session=False
+    )
+    
     db.commit()
-    db.refresh(comment)
+    
+    # 重新查詢以載入評論者資訊，新評論尚無回覆
+    comment = db.query(models.Comment).options(*COMMENT_LIST_LOADERS).filter(models.Comment.id == comment_id).one()
+    set_committed_value(comment, "replies", [])
     
     return comment
 
 
 @handle_none_value("Comment")
 @handle_error
+@retry_on_disconnect
 def get_comment_by_id(db: Session, comment_id: str) -> models.Comment:
     return db.query(models.Comment).filter(models.Comment.id == comment_id).first()
 
 
 @handle_error
+@retry_on_disconnect
 def get_comments_by_blog_id(
         db: Session,
         blog_id: str,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[Dict[str, Any]] = None,
+        max_replies: int = 3
 ) -> List[models.Comment]:
-    # 只獲取頂級評論（沒有父評論的評論）
-    comments = db.query(models.Comment).options(
-        joinedload(models.Comment.user),
-        joinedload(models.Comment.replies).joinedload(models.Comment.user)
-    ).filter(
+    # 只分頁頂級評論（沒有父評論的評論），新的在前
+    page = db.query(models.Comment.id).filter(
         models.Comment.blog_id == blog_id,
         models.Comment.parent_id == None
-    ).order_by(models.Comment.created_at.desc()).offset(skip).limit(limit).all()
+    )
+    if cursor:
+        page = page.filter(
+            or_(
+                models.Comment.created_at < cursor["created_at"],
+                and_(models.Comment.created_at == cursor["created_at"], models.Comment.id < cursor["id"])
+            )
+        )
+    page = page.order_by(models.Comment.created_at.desc(), models.Comment.id.desc())
+    
+    # 分頁 (有 cursor 時不使用 offset)
+    if not cursor:
+        page = page.offset(skip)
+    page = page.limit(limit).subquery()
+    
+    # 每個討論串依時間排序，只內嵌最早的 max_replies 則回覆
+    # 父評論必定早於其回覆，因此內嵌的回覆一定能接回樹上
+    ranked = db.query(
+        models.Comment.id.label("id"),
+        func.row_number().over(
+            partition_by=models.Comment.thread_id,
+            order_by=(models.Comment.created_at, models.Comment.id)
+        ).label("position")
+    ).join(page, models.Comment.thread_id == page.c.id).filter(models.Comment.parent_id != None).subquery()
+    
+    # 以 thread_id 一次查出本頁的頂級評論與內嵌回覆
+    comments = db.query(models.Comment).options(*COMMENT_LIST_LOADERS).join(
+        page, models.Comment.thread_id == page.c.id
+    ).outerjoin(ranked, ranked.c.id == models.Comment.id).filter(
+        or_(models.Comment.parent_id == None, ranked.c.position <= max_replies)
+    ).order_by(models.Comment.created_at, models.Comment.id).all()
+    
+    roots = [comment for comment in assemble_threads(comments) if comment.parent_id is None]
+    roots.sort(key=lambda comment: (comment.created_at, comment.id), reverse=True)
     
-    return comments
+    return roots
+
+
+@handle_error
+@retry_on_disconnect
+def get_replies(
+        db: Session,
+        comment_id: str,
+        limit: int = 20,
+        cursor: Optional[Dict[str, Any]] = None
+) -> List[models.Comment]:
+    # 直接回覆依時間先後排序，更深層的回覆由 reply_count 判斷是否需要再展開
+    query = db.query(models.Comment).options(*COMMENT_LIST_LOADERS).filter(
+        models.Comment.parent_id == comment_id
+    )
+    if cursor:
+        query = query.filter(
+            or_(
+                models.Comment.created_at > cursor["created_at"],
+                and_(models.Comment.created_at == cursor["created_at"], models.Comment.id > cursor["id"])
+            )
+        )
+    replies = query.order_by(models.Comment.created_at, models.Comment.id).limit(limit).all()
+    
+    for reply in replies:
+        set_committed_value(reply, "replies", [])
+    
+    return replies
+
+
+def encode_comment_cursor(comment: models.Comment) -> str:
+    return encode_cursor({"created_at": comment.created_at.isoformat(), "id": comment.id})
+
+
+def decode_comment_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    values = decode_cursor(cursor)
+    if values is None:
+        return None
+
+    try:
+        return {"created_at": datetime.fromisoformat(values["created_at"]), "id": str(values["id"])}
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _adjust_reply_count(db: Session, comment_id: str, delta: int) -> None:
+    # 以原子操作更新回覆數，並保留 updated_at 不變
+    db.query(models.Comment).filter(models.Comment.id == comment_id).update(
+        {
+            models.Comment.reply_count: models.Comment.reply_count + delta,
+            models.Comment.updated_at: models.Comment.updated_at
+        },
+        synchronize_session=False
+    )
+
+
+def assemble_threads(comments: List[models.Comment]) -> List[models.Comment]:
+    """
+    將依時間排序的評論組裝成樹狀結構，回傳不在此集合中有父評論的節點
+    """
+    loaded_ids = {comment.id for comment in comments}
+    children = defaultdict(list)
+    roots = []
+    for comment in comments:
+        if comment.parent_id in loaded_ids:
+            children[comment.parent_id].append(comment)
+        else:
+            roots.append(comment)
+    
+    # 直接設定已載入的回覆，不標記為變更也不觸發 lazy load
+    for comment in comments:
+        set_committed_value(comment, "replies", children.get(comment.id, []))
+    
+    return roots
 
 
 @handle_error
 def delete_comment(db: Session, comment_id: str, user_id: str) -> bool:
     comment = get_comment_by_id(db, comment_id)
     
-    # 確保只有評論作者才能刪除評論
+    # 確保只有評論作者才能刪除評論（僅檢查根評論，回覆隨之刪除）
     if comment.user_id != user_id:
         return False
     
-    # 遞迴刪除所有回覆
-    replies = db.query(models.Comment).filter(models.Comment.parent_id == comment_id).all()
-    for reply in replies:
-        delete_comment(db, reply.id, user_id)
+    # 以遞迴 CTE 一次找出整個子樹
+    subtree = select(models.Comment.id).where(models.Comment.id == comment_id).cte(name="subtree", recursive=True)
+    subtree = subtree.union_all(
+        select(models.Comment.id).where(models.Comment.parent_id == subtree.c.id)
+    )
+    subtree_ids = db.execute(select(subtree.c.id)).scalars().all()
+    
+    # 先解除子樹內的父子外鍵，再以單一 DELETE 刪除，避免逐層刪除
+    db.query(models.Comment).filter(models.Comment.id.in_(subtree_ids)).update(
+        {models.Comment.parent_id: None, models.Comment.updated_at: models.Comment.updated_at},
+        synchronize_session=False
+    )
+    db.query(models.Comment).filter(models.Comment.id.in_(subtree_ids)).delete(synchronize_session=False)
+    
+    # 更新父評論的回覆數
+    if comment.parent_id:
+        _adjust_reply_count(db, comment.parent_id, -1)
+    
+    # 更新文章的評論數，最後評論時間以剩餘評論重新計算
+    last_comment_at = select(func.max(models.Comment.created_at)).where(
+        models.Comment.blog_id == comment.blog_id
+    ).scalar_subquery()
+    db.query(models.Blog).filter(models.Blog.id == comment.blog_id).update(
+        {
+            models.Blog.comment_count: models.Blog.comment_count - len(subtree_ids),
+            models.Blog.last_comment_at: last_comment_at,
+            models.Blog.updated_at: models.Blog.updated_at
+        },
+        synchronize_session=False
+    )
     
-    db.delete(comment)
     db.commit()
     
-    return True
\ No newline at end of file
+    return True
+
+
+@handle_error
+def reconcile_comment_counts(db: Session, batch_size: int = 500) -> int:
+    """
+    依實際評論重新計算文章的評論數與最後評論時間，分批處理並回傳處理的文章數
+    """
+    comment_count = select(func.count()).where(
+        models.Comment.blog_id == models.Blog.id
+    ).scalar_subquery()
+    last_comment_at = select(func.max(models.Comment.created_at)).where(
+        models.Comment.blog_id == models.Blog.id
+    ).scalar_subquery()
+    
+    processed = 0
+    last_id = ""
+    while True:
+        # 依主鍵分批，每批獨立 commit 以縮短鎖定時間
+        blog_ids = db.query(models.Blog.id).filter(models.Blog.id > last_id).order_by(
+            models.Blog.id
+        ).limit(batch_size).all()
+        blog_ids = [blog_id for blog_id, in blog_ids]
+        if not blog_ids:
+            break
+        
+        db.query(models.Blog).filter(models.Blog.id.in_(blog_ids)).update(
+            {
+                models.Blog.comment_count: comment_count,
+                models.Blog.last_comment_at: last_comment_at,
+                models.Blog.updated_at: models.Blog.updated_at
+            },
+            synchronize_session=False
+        )
+        db.commit()
+        
+        processed += len(blog_ids)
+        last_id = blog_ids[-1]
+    
+    return processed
@@ -1,10 +1,11 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from ulid import ULID
 
 from src.database import models
-from src.utils.handler import handle_error, handle_none_value
+from src.utils.handler import handle_error, handle_none_value, retry_on_disconnect
 
 
 # 標籤相關CRUD
@@ -24,17 +25,20 @@ def create_tag(db: Session, name: str, tag_id: str = str(ULID())) -> models.Tag:
 
 @handle_none_value("Tag")
 @handle_error
+@retry_on_disconnect
 def get_tag_by_id(db: Session, tag_id: str) -> models.Tag:
     return db.query(models.Tag).filter(models.Tag.id == tag_id).first()
 
 
 @handle_none_value("Tag")
 @handle_error
+@retry_on_disconnect
 def get_tag_by_name(db: Session, name: str) -> models.Tag:
     return db.query(models.Tag).filter(models.Tag.name == name).first()
 
 
 @handle_error
+@retry_on_disconnect
 def get_tags(db: Session, skip: int = 0, limit: int = 100) -> List[models.Tag]:
     return db.query(models.Tag).order_by(models.Tag.name).offset(skip).limit(limit).all()
 
@@ -83,17 +87,20 @@ def create_category(
 
 @handle_none_value("Category")
 @handle_error
+@retry_on_disconnect
 def get_category_by_id(db: Session, category_id: str) -> models.Category:
     return db.query(models.Category).filter(models.Category.id == category_id).first()
 
 
 @handle_none_value("Category")
 @handle_error
+@retry_on_disconnect
 def get_category_by_name(db: Session, name: str) -> models.Category:
     return db.query(models.Category).filter(models.Category.name == name).first()
 
 
 @handle_error
+@retry_on_disconnect
 def get_categories(db: Session, skip: int = 0, limit: int = 100) -> List[models.Category]:
     return db.query(models.Category).order_by(models.Category.name).offset(skip).limit(limit).all()
 
@@ -127,3 +134,40 @@ def delete_category(db: Session, category_id: str) -> bool:
     db.commit()
     
     return True
+
+
+# 文章數計數器
+def refresh_blog_counts(
+        db: Session,
+        tag_ids: Optional[Iterable[str]] = None,
+        category_ids: Optional[Iterable[str]] = None
+) -> None:
+    """
+    重新計算受影響標籤與分類的已發布文章數，由呼叫端負責 commit
+    """
+    tag_ids = set(tag_ids or [])
+    category_ids = set(category_ids or [])
+
+    if tag_ids:
+        published = select(func.count()).select_from(
+            models.blog_tag_association.join(models.Blog)
+        ).where(
+            models.blog_tag_association.c.tag_id == models.Tag.id,
+            models.Blog.is_draft == False
+        ).scalar_subquery()
+        db.query(models.Tag).filter(models.Tag.id.in_(tag_ids)).update(
+            {models.Tag.blog_count: published, models.Tag.updated_at: models.Tag.updated_at},
+            synchronize_session=False
+        )
+
+    if category_ids:
+        published = select(func.count()).select_from(
+            models.blog_category_association.join(models.Blog)
+        ).where(
+            models.blog_category_association.c.category_id == models.Category.id,
+            models.Blog.is_draft == False
+        ).scalar_subquery()
+        db.query(models.Category).filter(models.Category.id.in_(category_ids)).update(
+            {models.Category.blog_count: published, models.Category.updated_at: models.Category.updated_at},
+            synchronize_session=False
+        )
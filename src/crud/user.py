@@ -1,24 +1,28 @@
 from typing import Type, List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager, selectinload
 from ulid import ULID
 
 from src.database import models
 from src.utils.credentials import hash_password
-from src.utils.handler import handle_error, handle_none_value
+from src.utils.handler import handle_error, handle_none_value, retry_on_disconnect
 
 
 @handle_none_value("User")
 @handle_error
+@retry_on_disconnect
 def get_user_by_id(db: Session, user_id: str) -> Type[models.User] | models.User | None:
-    user = db.query(models.User).filter_by(id=user_id).first()
+    user = db.query(models.User).options(selectinload(models.User.account)).filter_by(id=user_id).first()
     return user
 
 
 @handle_none_value("User")
 @handle_error
+@retry_on_disconnect
 def get_user_by_username(db: Session, username: str) -> models.User | None:
-    user = db.query(models.User).join(models.UserAccount).filter(models.UserAccount.username == username).first()
+    user = db.query(models.User).join(models.User.account).options(
+        contains_eager(models.User.account)
+    ).filter(models.UserAccount.username == username).first()
     return user
 
 
@@ -30,6 +34,9 @@ def create_user(
         password: str,
         user_id: str = str(ULID())
 ) -> Type[models.User] | models.User | None:
+    # 密碼雜湊耗時，於取得連線前先完成
+    hashed_password = hash_password(password)
+
     user = models.User(
         id=user_id,
         name=name
@@ -41,15 +48,14 @@ def create_user(
     account = models.UserAccount(
         id=str(ULID()),
         username=username,
-        password=hash_password(password),
+        password=hashed_password,
         user_id=user.id
     )
     db.add(account)
     db.commit()
-    db.refresh(account)
-    db.refresh(user)
 
-    return user
+    # 重新查詢以一併載入帳號
+    return get_user_by_id(db, user.id)
 
 
 @handle_error
@@ -68,9 +74,8 @@ def update_user(
         user.bio = bio
     
     db.commit()
-    db.refresh(user)
     
-    return user
+    return get_user_by_id(db, user_id)
 
 
 @handle_error
@@ -84,6 +89,5 @@ def update_user_avatar(
     user.avatar_url = avatar_url
     
     db.commit()
-    db.refresh(user)
     
-    return user
\ No newline at end of file
+    return get_user_by_id(db, user_id)
\ No newline at end of file
@@ -1,20 +1,52 @@
+import logging
 import os
+import threading
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 
 from src.database.models import Base
+from src.database.ping import install_idle_ping
+from src.database.pool_metrics import InstrumentedAsyncPool, InstrumentedQueuePool, install_pool_metrics
+from src.database.query_log import install_query_log
+from src.database.routing import (
+    DB_REPLICA_CHECK_INTERVAL,
+    DB_REPLICA_MAX_LAG_SECONDS,
+    ReplicaSet,
+    RoutingSession
+)
+
+logger = logging.getLogger(__name__)
 
 DB_HOST = os.getenv("DB_HOST", "mysql")
 DB_USER = os.getenv("DB_USER", "admin")
 DB_PASS = os.getenv("DB_PASS", "admin1234")
 DB_PORT = os.getenv("DB_PORT", "3306")
 DB_NAME = os.getenv("DB_NAME", "template_db")
+# 初始化時是否建立資料庫 (CREATE DATABASE IF NOT EXISTS)
+DB_CREATE_DATABASE = os.getenv("DB_CREATE_DATABASE", "true").lower() == "true"
+# 啟動時預先建立的連線數，只預熱公開列表等熱門路由使用的非同步唯讀連線池 (不超過該連線池大小)
+DB_POOL_PREWARM = int(os.getenv("DB_POOL_PREWARM", "2"))
+# 唯讀副本，以逗號分隔的 host 或 host:port，未設定時所有查詢使用主庫
+DB_REPLICA_HOSTS = [host.strip() for host in os.getenv("DB_REPLICA_HOSTS", "").split(",") if host.strip()]
+
+# 連線池設定 (每個 worker 的每個 engine 各自擁有一個連線池)
+# 總連線數 = workers × 4 個主庫連線池 × (pool_size + max_overflow)，需小於 MySQL 的 max_connections
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# 所有 worker 對主庫的連線總上限，依 worker 數 (WEB_CONCURRENCY) 平分給四個主庫連線池 (同步/非同步 × 讀寫/唯讀)，
+# DB_POOL_SIZE 與 DB_MAX_OVERFLOW 只作為每個連線池的上限。
+# 預設 120，低於 MySQL 預設 max_connections=151 並保留管理與遷移用的連線；設為 0 則不限制
+DB_CONNECTION_BUDGET = int(os.getenv("DB_CONNECTION_BUDGET", "120"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
 
 
-def get_database_url(user, password, host, port, db_name=None):
-    base_url = f"mysql+pymysql://{user}:{password}@{host}:{port}"
+def get_database_url(user, password, host, port, db_name=None, driver="mysql+pymysql"):
+    base_url = f"{driver}://{user}:{password}@{host}:{port}"
     return f"{base_url}/{db_name}?charset=utf8mb4" if db_name else base_url
 
 
@@ -52,21 +84,210 @@ def create_all_tables(_engine=None):
         print(f"Error creating tables: {e}")
 
 
+def get_replica_urls(driver="mysql+pymysql"):
+    urls = []
+    for replica in DB_REPLICA_HOSTS:
+        host, _, port = replica.partition(":")
+        urls.append(get_database_url(DB_USER, DB_PASS, host, port or DB_PORT, DB_NAME, driver))
+    return urls
+
+
+def get_pool_settings():
+    pool_size, max_overflow = DB_POOL_SIZE, DB_MAX_OVERFLOW
+    if DB_CONNECTION_BUDGET > 0:
+        # 每個 worker 有同步與非同步、讀寫與唯讀共四個主庫連線池
+        per_pool = DB_CONNECTION_BUDGET // (WEB_CONCURRENCY * 4)
+        if per_pool < 1:
+            logger.warning(
+                "DB_CONNECTION_BUDGET=%d is too small for %d workers × 4 pools, using 1 connection per pool",
+                DB_CONNECTION_BUDGET, WEB_CONCURRENCY
+            )
+            per_pool = 1
+        pool_size = min(pool_size, per_pool)
+        max_overflow = min(max_overflow, per_pool - pool_size)
+
+    # 不使用 pool_pre_ping，改由 install_idle_ping 只驗證閒置過久的連線
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+POOL_SETTINGS = get_pool_settings()
+
+# 唯讀連線維持 autocommit，不需 BEGIN/ROLLBACK 也不會長時間持有 REPEATABLE READ 快照，
+# 並在建立連線時設為 READ ONLY，由 MySQL 拒絕任何寫入
+READ_ONLY_SETTINGS = {"isolation_level": "AUTOCOMMIT", "skip_autocommit_rollback": True}
+
+
+def _set_session_read_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("SET SESSION TRANSACTION READ ONLY")
+    cursor.close()
+
+
+def create_instrumented_engine(url, name, read_only=False):
+    settings = {**POOL_SETTINGS, **READ_ONLY_SETTINGS} if read_only else POOL_SETTINGS
+    _engine = create_engine(url, poolclass=InstrumentedQueuePool, **settings)
+    # SET SESSION TRANSACTION READ ONLY 為 MySQL 語法，其他資料庫 (例如測試用的 SQLite) 只由 ReadSessionLocal 拒絕寫入
+    if read_only and _engine.dialect.name == "mysql":
+        event.listen(_engine, "connect", _set_session_read_only)
+    install_idle_ping(_engine)
+    # 記錄 SQL 語句以供 /db/queries 分析執行計畫，並統計連線池使用狀況以供 /db/pool 查詢
+    install_query_log(_engine)
+    install_pool_metrics(_engine, name)
+    return _engine
+
+
+def create_instrumented_async_engine(url, name, read_only=False):
+    settings = {**POOL_SETTINGS, **READ_ONLY_SETTINGS} if read_only else POOL_SETTINGS
+    _engine = create_async_engine(url, poolclass=InstrumentedAsyncPool, **settings)
+    if read_only and _engine.dialect.name == "mysql":
+        event.listen(_engine.sync_engine, "connect", _set_session_read_only)
+    install_idle_ping(_engine.sync_engine)
+    install_query_log(_engine.sync_engine)
+    install_pool_metrics(_engine.sync_engine, name)
+    return _engine
+
+
 # Construct URLs
 TRIAL_URL = get_database_url(DB_USER, DB_PASS, DB_HOST, DB_PORT)
 SQLALCHEMY_DATABASE_URL = get_database_url(DB_USER, DB_PASS, DB_HOST, DB_PORT, DB_NAME)
+ASYNC_SQLALCHEMY_DATABASE_URL = get_database_url(DB_USER, DB_PASS, DB_HOST, DB_PORT, DB_NAME, "mysql+aiomysql")
 
-# Create the database if it doesn't exist
-create_database_if_not_exists(TRIAL_URL, DB_NAME)
+class Database:
+    """
+    延遲建立 engine 與 Session 工廠，import 時不進行任何資料庫 I/O
+
+    由 lifespan 在接受請求前呼叫 init() 並預熱連線池，
+    其他情境 (alembic、腳本) 在第一次存取屬性時才自動初始化
+    """
+
+    def __init__(self):
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # 只在屬性尚未建立時觸發，初始化後直接取得屬性
+        if name.startswith("_") or self._initialized:
+            raise AttributeError(name)
+        self.init()
+        return getattr(self, name)
+
+    def init(self) -> None:
+        with self._lock:
+            if self._initialized:
+                return
+
+            # Create the database if it doesn't exist
+            if DB_CREATE_DATABASE:
+                create_database_if_not_exists(TRIAL_URL, DB_NAME)
+
+            # Create engine with connection pooling options
+            self.engine = create_instrumented_engine(SQLALCHEMY_DATABASE_URL, "primary")
+
+            # 主庫的唯讀連線池，供只讀取的 GET 請求使用
+            self.read_engine = create_instrumented_engine(SQLALCHEMY_DATABASE_URL, "primary:read", read_only=True)
+
+            # 唯讀副本與主庫使用相同的連線池設定，副本只用於讀取，一律使用唯讀連線
+            self.replica_engines = [
+                create_instrumented_engine(url, f"replica:{host}", read_only=True)
+                for host, url in zip(DB_REPLICA_HOSTS, get_replica_urls())
+            ]
+            replicas = ReplicaSet(
+                self.replica_engines,
+                DB_REPLICA_MAX_LAG_SECONDS,
+                DB_REPLICA_CHECK_INTERVAL
+            ) if self.replica_engines else None
+
+            # Create a configured "Session" class
+            # 讀取導向副本、寫入導向主庫
+            self.SessionLocal = sessionmaker(
+                autocommit=False,
+                autoflush=False,
+                bind=self.engine,
+                class_=RoutingSession,
+                replicas=replicas
+            )
+            # 唯讀 Session，寫入時拋出 ReadOnlySessionError
+            self.ReadSessionLocal = sessionmaker(
+                autoflush=False,
+                bind=self.read_engine,
+                class_=RoutingSession,
+                replicas=replicas,
+                read_only=True
+            )
+
+            # Async engine for handlers that must not block the event loop
+            self.async_engine = create_instrumented_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, "primary:async")
+            self.async_read_engine = create_instrumented_async_engine(
+                ASYNC_SQLALCHEMY_DATABASE_URL,
+                "primary:read:async",
+                read_only=True
+            )
+
+            self.async_replica_engines = [
+                create_instrumented_async_engine(url, f"replica:{host}:async", read_only=True)
+                for host, url in zip(DB_REPLICA_HOSTS, get_replica_urls("mysql+aiomysql"))
+            ]
+            async_replicas = ReplicaSet(
+                [replica_engine.sync_engine for replica_engine in self.async_replica_engines],
+                DB_REPLICA_MAX_LAG_SECONDS,
+                DB_REPLICA_CHECK_INTERVAL
+            ) if self.async_replica_engines else None
+
+            # 非同步 Session，commit 後不 expire，避免在 run_sync 之外觸發 lazy load
+            self.AsyncSessionLocal = async_sessionmaker(
+                self.async_engine,
+                autoflush=False,
+                expire_on_commit=False,
+                sync_session_class=RoutingSession,
+                replicas=async_replicas
+            )
+            self.AsyncReadSessionLocal = async_sessionmaker(
+                self.async_read_engine,
+                autoflush=False,
+                expire_on_commit=False,
+                sync_session_class=RoutingSession,
+                replicas=async_replicas,
+                read_only=True
+            )
+
+            self._initialized = True
+
+    async def warm_up(self, connections: int) -> None:
+        """
+        預先在非同步唯讀連線池建立連線，公開列表等熱門路由在 worker 開始接受請求時即有可用連線
+
+        其他連線池依需求建立，避免每個 worker 啟動時就佔用 4 × connections 條連線
+        """
+        connections = min(connections, POOL_SETTINGS["pool_size"])
+        if connections <= 0:
+            return
+
+        try:
+            await _warm_up_async_engine(self.async_read_engine, connections)
+        except OperationalError as e:
+            # 資料庫尚未就緒時不阻止啟動，之後的請求會再建立連線
+            print(f"Error warming up connection pools: {e}")
+
+    async def dispose(self) -> None:
+        if not self._initialized:
+            return
+
+        for _engine in [self.engine, self.read_engine, *self.replica_engines]:
+            _engine.dispose()
+        for _engine in [self.async_engine, self.async_read_engine, *self.async_replica_engines]:
+            await _engine.dispose()
+
+
+async def _warm_up_async_engine(_engine, connections):
+    # 同時持有多條連線，才會建立不同的連線而非重複使用同一條
+    opened = [await _engine.connect() for _ in range(connections)]
+    for connection in opened:
+        await connection.close()
 
-# Create engine with connection pooling options
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=1800,
-    pool_size=20,  # Adjust pool size as needed
-    max_overflow=10  # Adjust as needed
-)
 
-# Create a configured "Session" class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+database = Database()
@@ -1,29 +1,45 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer, Boolean, Table
+import os
+
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer, Boolean, Table, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, backref
 from sqlalchemy.sql import func
 
 Base = declarative_base()
 
+# 嚴格載入模式 (測試環境開啟): 未在查詢 loader 中宣告的關聯若需發出 SQL 載入即拋出錯誤，避免隱藏的 N+1
+DB_STRICT_LOADING = os.getenv("DB_STRICT_LOADING", "false").lower() == "true"
+RELATIONSHIP_LAZY = "raise_on_sql" if DB_STRICT_LOADING else "select"
+
 
 def lazy_relationship(*args, **kwargs):
+    kwargs.setdefault("lazy", RELATIONSHIP_LAZY)
     return relationship(*args, uselist=True, **kwargs)
 
 
+def scalar_relationship(*args, **kwargs):
+    kwargs.setdefault("lazy", RELATIONSHIP_LAZY)
+    return relationship(*args, uselist=False, **kwargs)
+
+
 # 文章與標籤的多對多關聯表
 blog_tag_association = Table(
     'blog_tag_association',
     Base.metadata,
-    Column('blog_id', String(36), ForeignKey('blogs.id')),
-    Column('tag_id', String(36), ForeignKey('tags.id'))
+    Column('blog_id', String(36), ForeignKey('blogs.id'), primary_key=True),
+    Column('tag_id', String(36), ForeignKey('tags.id'), primary_key=True),
+    # 依標籤反查文章時使用
+    Index('ix_blog_tag_association_tag_id', 'tag_id')
 )
 
 # 文章與分類的多對多關聯表
 blog_category_association = Table(
     'blog_category_association',
     Base.metadata,
-    Column('blog_id', String(36), ForeignKey('blogs.id')),
-    Column('category_id', String(36), ForeignKey('categories.id'))
+    Column('blog_id', String(36), ForeignKey('blogs.id'), primary_key=True),
+    Column('category_id', String(36), ForeignKey('categories.id'), primary_key=True),
+    # 依分類反查文章時使用
+    Index('ix_blog_category_association_category_id', 'category_id')
 )
 
 
@@ -38,7 +54,7 @@ class User(Base):
     bio = Column(Text, nullable=True)
     avatar_url = Column(String(512), nullable=True)
 
-    account = lazy_relationship("UserAccount", back_populates="user")
+    account = scalar_relationship("UserAccount", back_populates="user")
     blogs = lazy_relationship("Blog", back_populates="author")
     comments = lazy_relationship("Comment", back_populates="user")
 
@@ -54,11 +70,20 @@ class UserAccount(Base):
     password = Column(String(256))
 
     user_id = Column(String(36), ForeignKey("users.id"))
-    user = lazy_relationship("User", back_populates="account")
+    user = scalar_relationship("User", back_populates="account")
 
 
 class Blog(Base):
     __tablename__ = "blogs"
+    __table_args__ = (
+        # 列表排序用索引: WHERE is_draft = false ORDER BY 欄位 DESC, id DESC
+        Index("ix_blogs_is_draft_created_at", "is_draft", "created_at", "id"),
+        Index("ix_blogs_is_draft_view_count", "is_draft", "view_count", "id"),
+        Index("ix_blogs_is_draft_like_count", "is_draft", "like_count", "id"),
+        Index("ix_blogs_is_draft_updated_at", "is_draft", "updated_at", "id"),
+        # 作者文章列表: WHERE author_id = ? ORDER BY created_at DESC
+        Index("ix_blogs_author_id_created_at", "author_id", "created_at", "id"),
+    )
 
     id = Column(String(36), primary_key=True, index=True, unique=True)
     created_at = Column(DateTime, default=func.now())
@@ -71,13 +96,16 @@ class Blog(Base):
     is_draft = Column(Boolean, default=True)
     view_count = Column(Integer, default=0)
     like_count = Column(Integer, default=0)
+    # 評論數與最後評論時間，於新增與刪除評論時維護
+    comment_count = Column(Integer, default=0, server_default="0", nullable=False)
+    last_comment_at = Column(DateTime, nullable=True)
 
     author_id = Column(String(36), ForeignKey("users.id"))
-    author = lazy_relationship("User", back_populates="blogs")
+    author = scalar_relationship("User", back_populates="blogs")
     
     comments = lazy_relationship("Comment", back_populates="blog")
-    tags = relationship("Tag", secondary=blog_tag_association, back_populates="blogs")
-    categories = relationship("Category", secondary=blog_category_association, back_populates="blogs")
+    tags = lazy_relationship("Tag", secondary=blog_tag_association, back_populates="blogs")
+    categories = lazy_relationship("Category", secondary=blog_category_association, back_populates="blogs")
 
 
 class Category(Base):
@@ -89,8 +117,10 @@ class Category(Base):
 
     name = Column(String(64), unique=True, index=True)
     description = Column(String(256), nullable=True)
+    # 已發布文章數，於文章寫入時維護
+    blog_count = Column(Integer, default=0, server_default="0", nullable=False)
     
-    blogs = relationship("Blog", secondary=blog_category_association, back_populates="categories")
+    blogs = lazy_relationship("Blog", secondary=blog_category_association, back_populates="categories")
 
 
 class Tag(Base):
@@ -101,12 +131,22 @@ class Tag(Base):
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
     name = Column(String(64), unique=True, index=True)
+    # 已發布文章數，於文章寫入時維護
+    blog_count = Column(Integer, default=0, server_default="0", nullable=False)
     
-    blogs = relationship("Blog", secondary=blog_tag_association, back_populates="tags")
+    blogs = lazy_relationship("Blog", secondary=blog_tag_association, back_populates="tags")
 
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        # 文章評論列表: WHERE blog_id = ? AND parent_id IS NULL ORDER BY created_at DESC
+        Index("ix_comments_blog_id_parent_id_created_at", "blog_id", "parent_id", "created_at"),
+        # 查詢回覆
+        Index("ix_comments_parent_id", "parent_id"),
+        # 一次載入整個討論串
+        Index("ix_comments_thread_id_created_at", "thread_id", "created_at"),
+    )
 
     id = Column(String(36), primary_key=True, index=True, unique=True)
     created_at = Column(DateTime, default=func.now())
@@ -115,10 +155,15 @@ class Comment(Base):
     content = Column(Text)
     
     blog_id = Column(String(36), ForeignKey("blogs.id"))
-    blog = lazy_relationship("Blog", back_populates="comments")
+    blog = scalar_relationship("Blog", back_populates="comments")
     
     user_id = Column(String(36), ForeignKey("users.id"))
-    user = lazy_relationship("User", back_populates="comments")
+    user = scalar_relationship("User", back_populates="comments")
     
     parent_id = Column(String(36), ForeignKey("comments.id"), nullable=True)
-    replies = lazy_relationship("Comment", backref="parent", remote_side=[id])
+    replies = lazy_relationship("Comment", backref=backref("parent", remote_side=[id], lazy=RELATIONSHIP_LAZY))
+    
+    # 討論串根評論的 ID，頂層評論為自身 ID
+    thread_id = Column(String(36), nullable=True)
+    # 直接回覆數，於新增與刪除回覆時維護
+    reply_count = Column(Integer, default=0, server_default="0", nullable=False)
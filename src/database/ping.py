@@ -0,0 +1,39 @@
+import os
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+
+# 連線閒置超過此秒數才在取出時 ping 驗證，設為 0 則每次取出都驗證 (等同 pool_pre_ping)
+DB_PING_IDLE_SECONDS = float(os.getenv("DB_PING_IDLE_SECONDS", "30"))
+
+
+def install_idle_ping(engine: Engine, idle_seconds: float = DB_PING_IDLE_SECONDS) -> None:
+    """
+    只驗證閒置過久的連線，取代每次 checkout 都送出 ping 的 pool_pre_ping
+
+    近期使用過的連線直接交出，若仍已斷線則由 SQLAlchemy 依錯誤將其失效，
+    讀取函數再以 retry_on_disconnect 透明重試
+    """
+    dialect = engine.dialect
+
+    def on_connect(dbapi_connection, connection_record):
+        connection_record.info["idle_since"] = time.monotonic()
+
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info["idle_since"] = time.monotonic()
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        idle_since = connection_record.info.get("idle_since")
+        if idle_since is not None and time.monotonic() - idle_since < idle_seconds:
+            return
+
+        try:
+            dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            # 連線池收到 DisconnectionError 會捨棄此連線並改用新連線重試
+            raise exc.DisconnectionError(f"Idle connection failed ping: {e}") from e
+
+    event.listen(engine, "connect", on_connect)
+    event.listen(engine, "checkin", on_checkin)
+    event.listen(engine, "checkout", on_checkout)
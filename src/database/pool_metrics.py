@@ -0,0 +1,218 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# 目前請求的 ASGI scope，用於將連線佔用時間歸屬到路由
+current_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("current_scope", default=None)
+
+
+def _route_name(scope: Optional[Dict[str, Any]]) -> str:
+    if scope is None:
+        return "background"
+
+    # 路由比對完成後 scope 中會有 route，以路徑樣板彙整 (例如 /public/blogs/{blog_id})
+    # 子路由的 route.path 不含前綴，前綴由實際路徑補上
+    path = scope.get("path", "")
+    route_path = getattr(scope.get("route"), "path", None)
+    if route_path is not None:
+        segments = path.rstrip("/").split("/")
+        depth = len(route_path.rstrip("/").split("/")) - 1
+        path = "/".join(segments[:len(segments) - depth]) + route_path
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+class PoolStats:
+    """
+    單一連線池的累計統計: 取得連線的等待時間、逾時、建立與失效的連線數、連線存活時間
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.connections_created = 0
+        self.invalidations = 0
+        self.age_total = 0.0
+        self.age_max = 0.0
+        self._lock = threading.Lock()
+
+    def record_wait(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def record_age(self, age: float) -> None:
+        with self._lock:
+            self.age_total += age
+            self.age_max = max(self.age_max, age)
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connections_created += 1
+
+    def record_invalidate(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        pool = self.pool
+        with self._lock:
+            return {
+                "name": self.name,
+                # 目前狀態
+                "size": pool.size() if pool else None,
+                "checked_in": pool.checkedin() if pool else None,
+                "checked_out": pool.checkedout() if pool else None,
+                "overflow": pool.overflow() if pool else None,
+                # 累計統計
+                "checkouts": self.checkouts,
+                "wait_total_ms": self.wait_total * 1000,
+                "wait_avg_ms": self.wait_total * 1000 / self.checkouts if self.checkouts else 0.0,
+                "wait_max_ms": self.wait_max * 1000,
+                "timeouts": self.timeouts,
+                "connections_created": self.connections_created,
+                "invalidations": self.invalidations,
+                "age_avg_s": self.age_total / self.checkouts if self.checkouts else 0.0,
+                "age_max_s": self.age_max,
+            }
+
+
+class _InstrumentedPoolMixin:
+    """
+    記錄從連線池取得連線所花的時間 (排隊等待、建立新連線與驗證) 以及逾時次數
+    """
+
+    stats: Optional[PoolStats] = None
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if self.stats:
+                self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+
+        if self.stats:
+            self.stats.record_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() 會重建連線池，沿用原本的統計
+        pool = super().recreate()
+        pool.stats = self.stats
+        if self.stats:
+            self.stats.pool = pool
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncPool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class PoolMetrics:
+    """
+    統計各連線池的使用狀況，以及各路由從連線池取出連線到歸還之間的佔用時間
+    """
+
+    def __init__(self):
+        self.pools: Dict[str, PoolStats] = {}
+        self._routes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, held: float) -> None:
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {"route": route, "checkouts": 0, "total_ms": 0.0, "max_ms": 0.0}
+            entry["checkouts"] += 1
+            entry["total_ms"] += held * 1000
+            entry["max_ms"] = max(entry["max_ms"], held * 1000)
+
+    def routes(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = [dict(entry) for entry in self._routes.values()]
+        return sorted(entries, key=lambda entry: entry["total_ms"], reverse=True)
+
+    def pool_stats(self) -> List[Dict[str, Any]]:
+        return [stats.snapshot() for stats in list(self.pools.values())]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+pool_metrics = PoolMetrics()
+
+
+def install_pool_metrics(engine: Engine, name: str) -> None:
+    stats = PoolStats(name)
+    stats.pool = engine.pool
+    if isinstance(engine.pool, _InstrumentedPoolMixin):
+        engine.pool.stats = stats
+    pool_metrics.pools[name] = stats
+
+    def on_connect(dbapi_connection, connection_record):
+        connection_record.info["created_at"] = time.monotonic()
+        stats.record_connect()
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checkout_at"] = time.perf_counter()
+        connection_record.info["checkout_scope"] = current_scope.get()
+
+        created_at = connection_record.info.get("created_at")
+        if created_at is not None:
+            stats.record_age(time.monotonic() - created_at)
+
+    def on_checkin(dbapi_connection, connection_record):
+        start = connection_record.info.pop("checkout_at", None)
+        scope = connection_record.info.pop("checkout_scope", None)
+        if start is None:
+            return
+
+        # 歸還時 scope 已完成路由比對，可取得路徑樣板
+        pool_metrics.record(_route_name(scope), time.perf_counter() - start)
+
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        stats.record_invalidate()
+
+    event.listen(engine, "connect", on_connect)
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+    event.listen(engine, "invalidate", on_invalidate)
+
+
+class PoolMetricsMiddleware:
+    """
+    將請求的 scope 放入 context，讓連線池事件得知連線由哪個路由取出
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
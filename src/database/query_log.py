@@ -0,0 +1,116 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+# 保留的不重複 SQL 數量，設為 0 則停用記錄
+QUERY_LOG_SIZE = int(os.getenv("QUERY_LOG_SIZE", "200"))
+
+# EXPLAIN 支援的語句類型
+EXPLAINABLE_PREFIXES = ("SELECT", "UPDATE", "DELETE", "INSERT", "REPLACE")
+
+
+class QueryLog:
+    """
+    以 LRU 方式記錄最近執行的不重複 SQL 語句、呼叫次數與耗時
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, parameters: Any, duration: float) -> None:
+        with self._lock:
+            entry = self._entries.pop(statement, None)
+            if entry is None:
+                entry = {"statement": statement, "calls": 0, "total_ms": 0.0, "max_ms": 0.0}
+            entry["calls"] += 1
+            entry["total_ms"] += duration * 1000
+            entry["max_ms"] = max(entry["max_ms"], duration * 1000)
+            entry["parameters"] = parameters
+            entry["last_seen"] = datetime.now(timezone.utc)
+            self._entries[statement] = entry
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = list(self._entries.values())[-limit:] if limit > 0 else []
+            return [dict(entry) for entry in reversed(entries)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+query_log = QueryLog(QUERY_LOG_SIZE)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.query_log_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "query_log_start", None)
+    if start is None or not statement.lstrip().upper().startswith(EXPLAINABLE_PREFIXES):
+        return
+
+    # executemany 只保留第一組參數作為 EXPLAIN 範例
+    if executemany and parameters:
+        parameters = parameters[0]
+    query_log.record(statement, parameters, time.perf_counter() - start)
+
+
+def install_query_log(engine: Engine) -> None:
+    if QUERY_LOG_SIZE <= 0:
+        return
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def explain(connection: Connection, statement: str, parameters: Any = None) -> Dict[str, Any]:
+    """
+    以 EXPLAIN FORMAT=JSON 取得 SQL 的執行計畫 (MySQL)，parameters 為記錄時的參數
+    """
+    result = connection.exec_driver_sql(f"EXPLAIN FORMAT=JSON {statement}", parameters or None).scalar()
+    return json.loads(result)
+
+
+def _walk_plan(node: Any, tables: List[Dict[str, Any]]) -> None:
+    if isinstance(node, dict):
+        if "table_name" in node and "access_type" in node:
+            tables.append({
+                "table": node["table_name"],
+                "access_type": node["access_type"],
+                "key": node.get("key"),
+                "rows_examined_per_scan": node.get("rows_examined_per_scan"),
+            })
+        for value in node.values():
+            _walk_plan(value, tables)
+    elif isinstance(node, list):
+        for value in node:
+            _walk_plan(value, tables)
+
+
+def summarize_plan(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    從 EXPLAIN FORMAT=JSON 的結果整理出各資料表的存取方式與預估掃描列數
+    """
+    tables: List[Dict[str, Any]] = []
+    _walk_plan(plan, tables)
+    return {
+        "tables": tables,
+        "rows_examined": sum(table["rows_examined_per_scan"] or 0 for table in tables),
+        "full_scan": any(table["access_type"] == "ALL" for table in tables),
+        "query_cost": plan.get("query_block", {}).get("cost_info", {}).get("query_cost"),
+    }
@@ -0,0 +1,149 @@
+import logging
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+
+logger = logging.getLogger(__name__)
+
+# 寫入後此秒數內，同一用戶的讀取仍導向主庫 (應大於副本可接受的延遲)
+DB_READ_YOUR_WRITES_SECONDS = int(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+# 副本延遲超過此秒數即暫停使用，改讀主庫
+DB_REPLICA_MAX_LAG_SECONDS = int(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "2"))
+# 副本延遲檢查的間隔秒數
+DB_REPLICA_CHECK_INTERVAL = int(os.getenv("DB_REPLICA_CHECK_INTERVAL", "5"))
+
+READ_YOUR_WRITES_COOKIE = "db_primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# 目前請求是否必須使用主庫 (寫入請求，或剛寫入過的用戶)
+use_primary: ContextVar[bool] = ContextVar("use_primary", default=False)
+
+
+class ReadOnlySessionError(RuntimeError):
+    pass
+
+
+class ReplicaSet:
+    """
+    管理唯讀副本，定期檢查複寫延遲，只回傳延遲在容許範圍內的副本
+    """
+
+    def __init__(self, engines: List[Engine], max_lag: int, check_interval: int):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+
+        self._healthy: List[Engine] = list(engines)
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def choose(self) -> Optional[Engine]:
+        if not self.engines:
+            return None
+
+        if time.monotonic() - self._checked_at >= self.check_interval and self._lock.acquire(blocking=False):
+            # 同一時間只由一個請求檢查，其餘沿用上次結果
+            try:
+                self._healthy = [engine for engine in self.engines if self._within_lag(engine)]
+                self._checked_at = time.monotonic()
+            finally:
+                self._lock.release()
+
+        return random.choice(self._healthy) if self._healthy else None
+
+    def _within_lag(self, engine: Engine) -> bool:
+        try:
+            with engine.connect() as connection:
+                try:
+                    status = connection.execute(text("SHOW REPLICA STATUS")).mappings().first()
+                    lag_key = "Seconds_Behind_Source"
+                except Exception:
+                    # MySQL 8.0.22 以前的語法
+                    status = connection.execute(text("SHOW SLAVE STATUS")).mappings().first()
+                    lag_key = "Seconds_Behind_Master"
+        except Exception as e:
+            logger.warning("Replica %s unavailable, reading from primary: %s", engine.url.host, e)
+            return False
+
+        # 未設定複寫 (例如開發環境直接指向主庫) 視為無延遲
+        if status is None:
+            return True
+
+        lag = status.get(lag_key)
+        if lag is None or lag > self.max_lag:
+            logger.warning("Replica %s lag %s exceeds %ss, reading from primary", engine.url.host, lag, self.max_lag)
+            return False
+        return True
+
+
+class RoutingSession(Session):
+    """
+    讀取導向副本、寫入導向主庫的 Session
+
+    - flush 與 INSERT/UPDATE/DELETE 一律使用主庫，之後本 Session 的讀取也留在主庫，避免讀到尚未複寫的資料
+    - 寫入請求或仍在 read-your-writes 期間的用戶，整個請求使用主庫
+    - 沒有可用副本時使用主庫
+    - read_only 的 Session 拒絕任何寫入
+    """
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, read_only: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.read_only = read_only
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+        if self._flushing or isinstance(clause, UpdateBase):
+            if self.read_only:
+                raise ReadOnlySessionError("Write attempted through a read-only session")
+            self.info["primary"] = True
+        if self.replicas is None or self.info.get("primary") or use_primary.get():
+            return primary
+
+        return self.replicas.choose() or primary
+
+
+class ReadYourWritesMiddleware:
+    """
+    寫入請求成功後以 cookie 記錄期限，期限內同一用戶的請求改讀主庫
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        is_write = scope["method"] not in SAFE_METHODS
+        try:
+            primary_until = float(HTTPConnection(scope).cookies.get(READ_YOUR_WRITES_COOKIE, 0))
+        except ValueError:
+            primary_until = 0.0
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{READ_YOUR_WRITES_COOKIE}={time.time() + DB_READ_YOUR_WRITES_SECONDS:.3f}; "
+                    f"Max-Age={DB_READ_YOUR_WRITES_SECONDS}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        token = use_primary.set(is_write or primary_until > time.time())
+        try:
+            await self.app(scope, receive, send_with_cookie if is_write else send)
+        finally:
+            use_primary.reset(token)
@@ -5,10 +5,10 @@ from src.crud.user import create_user
 from src.crud.taxonomy import create_category, create_tag
 from src.crud.blog import create_blog
 from src.crud.comment import create_comment
-from src.database.database import SessionLocal
+from src.database.database import database
 
 def add_test_data():
-    db: Session = SessionLocal()
+    db: Session = database.SessionLocal()
     try:
         # 創建測試使用者
         test_user = create_user(db, "測試使用者", "test-username", "test-password", "test-user-id")
@@ -4,12 +4,12 @@ from typing import Annotated
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer, APIKeyHeader
 from jose import JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager, sessionmaker
 
 from src.database import models
-from src.dependencies.basic import get_db
+from src.dependencies.basic import get_read_session_factory
 from src.utils.credentials import verify_password, decode_token
-from src.utils.handler import handle_error, handle_none_value
+from src.utils.handler import handle_error, handle_none_value, retry_on_disconnect
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/public/auth/login", auto_error=True)
 
@@ -20,21 +20,27 @@ super_admin_api_key_header = APIKeyHeader(name="X-SUPER-ADMIN-TOKEN", auto_error
 
 @handle_none_value("User")
 @handle_error
+@retry_on_disconnect
 def get_user_by_username(db: Session, username: str) -> models.User | None:
-    user = db.query(models.User).join(models.UserAccount).filter(models.UserAccount.username == username).first()
+    # 查詢已 join 帳號，直接以 contains_eager 填入關聯，避免額外查詢
+    user = db.query(models.User).join(models.User.account).options(
+        contains_eager(models.User.account)
+    ).filter(models.UserAccount.username == username).first()
     return user
 
 
-def authenticate_user(db: Session, username: str, password: str) -> models.User:
-    user = get_user_by_username(db, username)
+def authenticate_user(session_factory: sessionmaker, username: str, password: str) -> models.User:
+    # 密碼雜湊比對耗時，查詢完成即結束 Session 歸還連線，再於 with 之外驗證
+    with session_factory() as db:
+        user = get_user_by_username(db, username)
+    
     if not user or not user.account:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用戶不存在或密碼錯誤"
         )
     
-    account = user.account[0] if isinstance(user.account, list) and user.account else user.account
-    truth_password = account.password if hasattr(account, 'password') else None
+    truth_password = user.account.password
     
     if not truth_password or not verify_password(password, truth_password):
         raise HTTPException(
@@ -46,7 +52,7 @@ def authenticate_user(db: Session, username: str, password: str) -> models.User:
 
 async def get_current_user(
         token: Annotated[str, Depends(oauth2_scheme)],
-        db: Session = Depends(get_db)
+        session_factory: sessionmaker = Depends(get_read_session_factory)
 ) -> models.User:
     try:
         # 解析令牌
@@ -62,8 +68,10 @@ async def get_current_user(
         
         # 獲取用戶
         try:
-            user = get_user_by_username(db, username)
-            return user
+            # 使用獨立的 Session，使用者與帳號完整載入後即歸還連線，
+            # 避免在不需資料庫的路由 (例如上傳檔案) 中持續佔用連線，也不影響路由自己的 Session
+            with session_factory() as db:
+                return get_user_by_username(db, username)
         except HTTPException as e:
             if e.status_code == 404:
                 raise HTTPException(
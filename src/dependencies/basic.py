@@ -2,7 +2,7 @@ import os
 
 from redis import StrictRedis as Redis
 
-from src.database.database import SessionLocal
+from src.database.database import database
 
 
 def get_redis_client() -> Redis:
@@ -18,8 +18,37 @@ def get_redis_client() -> Redis:
 
 
 def get_db():
-    db = SessionLocal()
+    db = database.SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """
+    只讀取的路由使用，autocommit 連線不開啟交易，寫入會被拒絕
+    """
+    db = database.ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_session_factory():
+    """
+    需要在路由執行前就歸還連線的依賴 (例如認證) 使用，以 with 自行管理唯讀 Session，
+    不與路由透過 get_read_db 取得的 Session 共用
+    """
+    return database.ReadSessionLocal
+
+
+async def get_async_db():
+    async with database.AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    async with database.AsyncReadSessionLocal() as db:
+        yield db
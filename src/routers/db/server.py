@@ -1,44 +1,65 @@
 import subprocess
-from typing import Annotated
+from typing import Annotated, Any, Dict, List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import text
 
-from src.dependencies.auth import get_super_admin_user
-from src.dependencies.basic import get_db
+from src.database.pool_metrics import pool_metrics
+from src.database.query_log import explain, query_log, summarize_plan
+from src.dependencies.basic import get_db, get_read_db
+from src.schemas import db as schemas
 from src.schemas.basic import TextOnly
 
 router = APIRouter()
 
+# alembic.ini、alembic/ 與 run_alembic.sh 於容器中的位置
+ALEMBIC_DIR = "/run"
+
 
 @router.post("/renew")
 async def renew_database():
-    from src.database.database import engine, drop_all_tables
+    from src.database.database import database, drop_all_tables
     from src.database.database import create_all_tables
     from src.database.utils import add_test_data
 
-    drop_all_tables(engine)
-    create_all_tables(engine)
+    drop_all_tables(database.engine)
+    create_all_tables(database.engine)
+
+    # create_all 已建立最新的 schema，標記為最新版本，之後的 upgrade head 只會套用新增的 migration
+    subprocess.run(['alembic', 'stamp', 'head', '--purge'], cwd=ALEMBIC_DIR, check=True)
+
     add_test_data()
     return TextOnly(text="Database Renewed")
 
 
 @router.post('/alembic')
 async def alembic(
-        db: Annotated[Session, Depends(get_db)]
+        db: Annotated[Session, Depends(get_db, scope="function")]
 ):
     from src.database.database import TRIAL_URL, DB_NAME
     from src.database.database import create_database_if_not_exists
 
     create_database_if_not_exists(TRIAL_URL, DB_NAME)
 
-    # remove alembic_version table
-    db.execute(text("DROP TABLE IF EXISTS alembic_version"))
-    db.commit()
+    # 舊流程每次重新產生 migration，資料庫記錄的版本已不存在於 alembic/versions，
+    # 此時視為 migration 前的基準 schema，移除版本記錄後從第一個 migration 開始套用
+    if inspect(db.get_bind()).has_table("alembic_version"):
+        from alembic.config import Config
+        from alembic.script import ScriptDirectory
+
+        config = Config(f"{ALEMBIC_DIR}/alembic.ini")
+        config.set_main_option("script_location", f"{ALEMBIC_DIR}/alembic")
+        script = ScriptDirectory.from_config(config)
+        known = {revision.revision for revision in script.walk_revisions()}
+        versions = db.execute(text("SELECT version_num FROM alembic_version")).scalars().all()
+        if any(version not in known for version in versions):
+            db.execute(text("DROP TABLE alembic_version"))
+            db.commit()
 
     # execute `bash /run/run_alembic.sh` and return the output
-    process = subprocess.Popen(['/bin/bash', '/run/run_alembic.sh'],
+    process = subprocess.Popen(['/bin/bash', f'{ALEMBIC_DIR}/run_alembic.sh'],
                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
     output, error = process.communicate()
@@ -47,3 +68,88 @@ async def alembic(
         "output": output.decode('utf-8').split('\n'),
         "error": error.decode('utf-8').split('\n')
     }
+
+
+@router.post("/reconcile/comment-counts", response_model=TextOnly)
+async def reconcile_comment_counts(
+        db: Annotated[Session, Depends(get_db, scope="function")],
+        batch_size: int = Query(500, ge=1, le=10000, description="每批處理的文章數")
+):
+    from src.crud.comment import reconcile_comment_counts
+
+    processed = reconcile_comment_counts(db, batch_size=batch_size)
+    return TextOnly(text=f"Reconciled comment counts for {processed} blogs")
+
+
+@router.get("/queries", response_model=List[schemas.QueryStat])
+async def get_recent_queries(
+        limit: int = Query(20, ge=1, le=200, description="回傳最近的不重複 SQL 數量")
+):
+    return [_to_query_stat(entry) for entry in query_log.recent(limit)]
+
+
+@router.get("/queries/explain", response_model=List[schemas.QueryPlan])
+async def explain_recent_queries(
+        db: Annotated[Session, Depends(get_read_db, scope="function")],
+        limit: int = Query(10, ge=1, le=50, description="要分析執行計畫的最近 SQL 數量")
+):
+    plans = []
+    for entry in query_log.recent(limit):
+        stat = _to_query_stat(entry).model_dump()
+        try:
+            # 以最後一次執行時的參數取得執行計畫
+            plan = explain(db.connection(), entry["statement"], entry["parameters"])
+            plans.append(schemas.QueryPlan(**stat, **summarize_plan(plan), plan=plan))
+        except Exception as e:
+            db.rollback()
+            plans.append(schemas.QueryPlan(**stat, error=str(e)))
+
+    return plans
+
+
+@router.delete("/queries", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_recent_queries():
+    query_log.clear()
+    return
+
+
+@router.get("/pool", response_model=List[schemas.PoolStat])
+async def get_pool_stats():
+    return [
+        schemas.PoolStat(**{
+            key: round(value, 3) if isinstance(value, float) else value
+            for key, value in stats.items()
+        })
+        for stats in pool_metrics.pool_stats()
+    ]
+
+
+@router.get("/connections", response_model=List[schemas.ConnectionHoldStat])
+async def get_connection_hold_times():
+    return [
+        schemas.ConnectionHoldStat(
+            route=entry["route"],
+            checkouts=entry["checkouts"],
+            total_ms=round(entry["total_ms"], 3),
+            avg_ms=round(entry["total_ms"] / entry["checkouts"], 3),
+            max_ms=round(entry["max_ms"], 3)
+        )
+        for entry in pool_metrics.routes()
+    ]
+
+
+@router.delete("/connections", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_connection_hold_times():
+    pool_metrics.clear()
+    return
+
+
+def _to_query_stat(entry: Dict[str, Any]) -> schemas.QueryStat:
+    return schemas.QueryStat(
+        statement=entry["statement"],
+        calls=entry["calls"],
+        total_ms=round(entry["total_ms"], 3),
+        avg_ms=round(entry["total_ms"] / entry["calls"], 3),
+        max_ms=round(entry["max_ms"], 3),
+        last_seen=entry["last_seen"]
+    )
@@ -1,14 +1,16 @@
 from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Response
 from sqlalchemy.orm import Session
 
 from src.crud import blog as blog_crud
 from src.database import models
 from src.dependencies.auth import get_current_user
-from src.dependencies.basic import get_db
+from src.dependencies.basic import get_db, get_read_db
 from src.schemas import blog as schemas
 from src.utils import s3
+from src.utils.fieldsets import parse_fields, selectable_fields, sparse_response
+from src.utils.pagination import paginate
 
 router = APIRouter()
 
@@ -17,7 +19,7 @@ router = APIRouter()
 async def create_blog(
         blog_data: schemas.BlogCreate,
         current_user: Annotated[models.User, Depends(get_current_user)],
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_db, scope="function")
 ):
     # 創建新部落格文章
     new_blog = blog_crud.create_blog(
@@ -33,7 +35,7 @@ async def create_blog(
     )
     
     # 構建響應
-    return convert_blog_to_detail(new_blog)
+    return new_blog
 
 
 @router.get("", response_model=List[schemas.BlogSummary])
@@ -44,34 +46,63 @@ async def get_blogs(
         category_id: Optional[str] = None,
         search: Optional[str] = None,
         author_id: Optional[str] = None,
+        sort: schemas.BlogSortOrder = schemas.BlogSortOrder.LATEST,
+        cursor: Optional[str] = None,
+        include_total: bool = Query(False, description="是否於 X-Total-Count 回傳總數 (未過濾時以 X-Total-Count-Estimate 回傳包含草稿的估計值)"),
+        fields: Optional[str] = Query(None, description=f"只回傳指定欄位，以逗號分隔: {','.join(selectable_fields(schemas.BlogSummary))}"),
+        response: Response = None,
         current_user: Annotated[models.User, Depends(get_current_user)] = None,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_read_db, scope="function")
 ):
-    # 獲取部落格文章列表
+    selected = parse_fields(fields, schemas.BlogSummary)
+    
+    # 如果查看的是自己的文章，也顯示草稿
+    show_drafts = author_id == current_user.id if current_user and author_id else False
+    
+    # 獲取部落格文章列表，多取一筆以判斷是否有下一頁
     blogs = blog_crud.get_blogs(
         db=db,
         skip=skip,
-        limit=limit,
+        limit=limit + 1,
         tag_id=tag_id,
         category_id=category_id,
         search_term=search,
         author_id=author_id,
-        # 如果查看的是自己的文章，也顯示草稿
-        show_drafts=author_id == current_user.id if current_user and author_id else False
+        show_drafts=show_drafts,
+        sort=sort,
+        cursor=blog_crud.decode_blog_cursor(cursor, sort),
+        fields=selected
     )
     
-    # 構建響應
-    return [convert_blog_to_summary(blog) for blog in blogs]
+    total = blog_crud.count_blogs(
+        db=db,
+        tag_id=tag_id,
+        category_id=category_id,
+        author_id=author_id,
+        search_term=search,
+        show_drafts=show_drafts
+    ) if include_total else None
+    
+    # 分頁資訊透過 header 回傳
+    blogs = paginate(response, blogs, limit, lambda blog: blog_crud.encode_blog_cursor(blog, sort), total)
+    
+    # 只回傳指定欄位；否則由 response_model 直接讀取 ORM 物件構建響應
+    if selected:
+        return sparse_response(blogs, schemas.BlogSummary, selected, response)
+    return blogs
 
 
 @router.get("/{blog_id}", response_model=schemas.BlogDetail)
 async def get_blog(
         blog_id: str,
         increment_view: bool = Query(False, description="是否增加瀏覽次數"),
-        db: Session = Depends(get_db)
+        fields: Optional[str] = Query(None, description=f"只回傳指定欄位，以逗號分隔: {','.join(selectable_fields(schemas.BlogDetail))}"),
+        db: Session = Depends(get_db, scope="function")
 ):
+    selected = parse_fields(fields, schemas.BlogDetail)
+    
     # 獲取單篇部落格文章
-    blog = blog_crud.get_blog_by_id(db, blog_id, increment_view=increment_view)
+    blog = blog_crud.get_blog_by_id(db, blog_id, increment_view=increment_view, fields=selected)
     
     # 檢查是否為草稿
     if blog.is_draft:
@@ -81,7 +112,9 @@ async def get_blog(
         )
     
     # 構建響應
-    return convert_blog_to_detail(blog)
+    if selected:
+        return sparse_response(blog, schemas.BlogDetail, selected)
+    return blog
 
 
 @router.put("/{blog_id}", response_model=schemas.BlogDetail)
@@ -89,7 +122,7 @@ async def update_blog(
         blog_id: str,
         blog_data: schemas.BlogUpdate,
         current_user: Annotated[models.User, Depends(get_current_user)],
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_db, scope="function")
 ):
     # 更新部落格文章
     updated_blog = blog_crud.update_blog(
@@ -106,14 +139,14 @@ async def update_blog(
         )
     
     # 構建響應
-    return convert_blog_to_detail(updated_blog)
+    return updated_blog
 
 
 @router.delete("/{blog_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_blog(
         blog_id: str,
         current_user: Annotated[models.User, Depends(get_current_user)],
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_db, scope="function")
 ):
     # 刪除部落格文章
     success = blog_crud.delete_blog(db, blog_id, current_user.id)
@@ -158,104 +191,11 @@ async def upload_blog_cover(
 @router.post("/{blog_id}/like", response_model=schemas.BlogDetail)
 async def like_blog(
         blog_id: str,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_db, scope="function")
 ):
     # 增加部落格文章喜歡次數
     blog = blog_crud.like_blog(db, blog_id)
     
     # 構建響應
-    return convert_blog_to_detail(blog)
-
+    return blog
 
-# 輔助函數，將Blog模型轉換為BlogDetail
-def convert_blog_to_detail(blog: models.Blog) -> schemas.BlogDetail:
-    return schemas.BlogDetail(
-        id=blog.id,
-        title=blog.title,
-        content=blog.content,
-        summary=blog.summary,
-        cover_image_url=blog.cover_image_url,
-        is_draft=blog.is_draft,
-        view_count=blog.view_count,
-        like_count=blog.like_count,
-        created_at=blog.created_at.isoformat(),
-        updated_at=blog.updated_at.isoformat(),
-        author=schemas.UserDetail(
-            id=blog.author.id,
-            name=blog.author.name,
-            username=blog.author.account[0].username,
-            bio=blog.author.bio,
-            avatar_url=blog.author.avatar_url,
-            created_at=blog.author.created_at.isoformat()
-        ),
-        tags=[
-            schemas.TagDetail(id=tag.id, name=tag.name)
-            for tag in blog.tags
-        ],
-        categories=[
-            schemas.CategoryDetail(
-                id=category.id,
-                name=category.name,
-                description=category.description
-            )
-            for category in blog.categories
-        ]
-    )
-
-
-# 輔助函數，將Blog模型轉換為BlogSummary
-def convert_blog_to_summary(blog: models.Blog) -> schemas.BlogSummary:
-    # 處理作者資訊 - 修正以處理InstrumentedList
-    try:
-        author = blog.author
-        if isinstance(author, list) and author:
-            # 如果author是一個列表（InstrumentedList），取第一個元素
-            author = author[0]
-        
-        # 確保author是一個對象而不是None
-        if not author:
-            author_name = "未知用戶"
-        else:
-            author_name = getattr(author, 'name', "未知用戶")
-        
-        # 安全地處理標籤和分類
-        tags = [
-            tag.name for tag in blog.tags
-            if hasattr(tag, 'name')
-        ] if hasattr(blog, 'tags') and blog.tags else []
-        
-        categories = [
-            category.name for category in blog.categories
-            if hasattr(category, 'name')
-        ] if hasattr(blog, 'categories') and blog.categories else []
-        
-        return schemas.BlogSummary(
-            id=blog.id,
-            title=blog.title,
-            summary=blog.summary,
-            cover_image_url=blog.cover_image_url,
-            created_at=blog.created_at.isoformat(),
-            view_count=blog.view_count,
-            like_count=blog.like_count,
-            author_name=author_name,
-            tags=tags,
-            categories=categories
-        )
-    except Exception as e:
-        print(f"轉換摘要時出錯: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
-        
-        # 如果出錯，返回最小化的摘要
-        return schemas.BlogSummary(
-            id=blog.id if hasattr(blog, 'id') else "unknown",
-            title=blog.title if hasattr(blog, 'title') else "未知標題",
-            summary=blog.summary if hasattr(blog, 'summary') else None,
-            cover_image_url=blog.cover_image_url if hasattr(blog, 'cover_image_url') else None,
-            created_at=blog.created_at.isoformat() if hasattr(blog, 'created_at') else "",
-            view_count=blog.view_count if hasattr(blog, 'view_count') else 0,
-            like_count=blog.like_count if hasattr(blog, 'like_count') else 0,
-            author_name="未知用戶",
-            tags=[],
-            categories=[]
-        )
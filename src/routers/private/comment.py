@@ -1,13 +1,14 @@
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from src.crud import comment as comment_crud
 from src.database import models
 from src.dependencies.auth import get_current_user
-from src.dependencies.basic import get_db
+from src.dependencies.basic import get_db, get_read_db
 from src.schemas import blog as schemas
+from src.utils.pagination import paginate
 
 router = APIRouter()
 
@@ -16,7 +17,7 @@ router = APIRouter()
 async def create_comment(
         comment_data: schemas.CommentCreate,
         current_user: Annotated[models.User, Depends(get_current_user)],
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_db, scope="function")
 ):
     try:
         # 創建新評論，讓系統自動生成ID
@@ -30,7 +31,9 @@ async def create_comment(
         )
         
         # 構建響應
-        return convert_comment_to_detail(new_comment)
+        return new_comment
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         print(f"創建評論錯誤: {str(e)}")
@@ -46,25 +49,56 @@ async def get_blog_comments(
         blog_id: str,
         skip: int = 0,
         limit: int = 50,
-        db: Session = Depends(get_db)
+        cursor: Optional[str] = None,
+        max_replies: int = Query(3, ge=0, le=50, description="每個討論串內嵌的回覆數上限"),
+        response: Response = None,
+        db: Session = Depends(get_read_db, scope="function")
 ):
-    # 獲取部落格文章的評論
+    # 獲取部落格文章的評論，多取一筆以判斷是否有下一頁
     comments = comment_crud.get_comments_by_blog_id(
         db=db,
         blog_id=blog_id,
         skip=skip,
-        limit=limit
+        limit=limit + 1,
+        cursor=comment_crud.decode_comment_cursor(cursor),
+        max_replies=max_replies
     )
     
+    # 分頁資訊透過 header 回傳
+    comments = paginate(response, comments, limit, comment_crud.encode_comment_cursor)
+    
+    # 構建響應
+    return comments
+
+
+@router.get("/{comment_id}/replies", response_model=List[schemas.CommentDetail])
+async def get_comment_replies(
+        comment_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        response: Response = None,
+        db: Session = Depends(get_read_db, scope="function")
+):
+    # 展開評論的直接回覆，多取一筆以判斷是否有下一頁
+    replies = comment_crud.get_replies(
+        db=db,
+        comment_id=comment_id,
+        limit=limit + 1,
+        cursor=comment_crud.decode_comment_cursor(cursor)
+    )
+    
+    # 分頁資訊透過 header 回傳
+    replies = paginate(response, replies, limit, comment_crud.encode_comment_cursor)
+    
     # 構建響應
-    return [convert_comment_to_detail(comment) for comment in comments]
+    return replies
 
 
 @router.delete("/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_comment(
         comment_id: str,
         current_user: Annotated[models.User, Depends(get_current_user)],
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_db, scope="function")
 ):
     # 刪除評論
     success = comment_crud.delete_comment(
@@ -81,32 +115,3 @@ async def delete_comment(
     
     return
 
-
-# 輔助函數，將Comment模型轉換為CommentDetail
-def convert_comment_to_detail(comment: models.Comment) -> schemas.CommentDetail:
-    # 檢查用戶是否存在
-    user = comment.user
-    if isinstance(user, list) and user:
-        user = user[0]
-    
-    user_detail = schemas.UserDetail(
-        id=user.id,
-        name=user.name,
-        username=user.account[0].username if hasattr(user, 'account') and user.account else "",
-        bio=getattr(user, 'bio', None),
-        avatar_url=getattr(user, 'avatar_url', None),
-        created_at=user.created_at.isoformat()
-    )
-    
-    # 檢查是否有回覆
-    replies = []
-    if hasattr(comment, 'replies') and comment.replies:
-        replies = [convert_comment_to_detail(reply) for reply in comment.replies]
-    
-    return schemas.CommentDetail(
-        id=comment.id,
-        content=comment.content,
-        created_at=comment.created_at.isoformat(),
-        user=user_detail,
-        replies=replies
-    )
\ No newline at end of file
@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from src.crud import taxonomy as taxonomy_crud
 from src.database import models
 from src.dependencies.auth import get_current_user
-from src.dependencies.basic import get_db
+from src.dependencies.basic import get_db, get_read_db
 from src.schemas import blog as schemas
 
 router = APIRouter()
@@ -16,7 +16,7 @@ router = APIRouter()
 async def get_tags(
         skip: int = 0,
         limit: int = 100,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_read_db, scope="function")
 ):
     # 獲取所有標籤
     tags = taxonomy_crud.get_tags(db, skip=skip, limit=limit)
@@ -35,7 +35,7 @@ async def get_tags(
 async def create_tag(
         tag_data: schemas.TagCreate,
         current_user: Annotated[models.User, Depends(get_current_user)],
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_db, scope="function")
 ):
     # 檢查標籤名稱是否已存在
     try:
@@ -1,13 +1,14 @@
+import asyncio
 from typing import Annotated, Dict, Any
 
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 import traceback
 
 from src.crud import user as user_crud
 from src.database import models
 from src.dependencies.auth import get_current_user
-from src.dependencies.basic import get_db
+from src.dependencies.basic import get_db, get_read_session_factory
 from src.schemas import base, blog as schemas
 from src.utils import s3
 
@@ -17,12 +18,15 @@ router = APIRouter()
 @router.post("/register", response_model=schemas.UserDetail, status_code=status.HTTP_201_CREATED)
 async def register(
         user_data: schemas.UserRegister,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_db, scope="function"),
+        session_factory: sessionmaker = Depends(get_read_session_factory)
 ):
     try:
-        # 檢查使用者名稱是否已存在
+        # 檢查使用者名稱是否已存在，以獨立的 Session 查詢並立即歸還連線，
+        # db 在 create_user 雜湊密碼後才取得連線
         try:
-            existing_user = user_crud.get_user_by_username(db, user_data.username)
+            with session_factory() as read_db:
+                existing_user = user_crud.get_user_by_username(read_db, user_data.username)
             if existing_user:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -32,22 +36,16 @@ async def register(
             if e.status_code != 404:  # 如果錯誤不是 "找不到用戶"，則重新拋出異常
                 raise
         
-        # 創建新使用者
-        new_user = user_crud.create_user(
+        # 創建新使用者，密碼雜湊會佔用 CPU 數百毫秒，於執行緒中執行以免阻塞事件迴圈
+        new_user = await asyncio.to_thread(
+            user_crud.create_user,
             db=db,
             name=user_data.name,
             username=user_data.username,
             password=user_data.password
         )
         
-        return schemas.UserDetail(
-            id=new_user.id,
-            name=new_user.name,
-            username=new_user.account[0].username,
-            bio=new_user.bio,
-            avatar_url=new_user.avatar_url,
-            created_at=new_user.created_at.isoformat()
-        )
+        return new_user
     except Exception as e:
         print(f"註冊失敗: {str(e)}")
         print(traceback.format_exc())
@@ -61,21 +59,14 @@ async def register(
 async def get_current_user_detail(
         current_user: Annotated[models.User, Depends(get_current_user)]
 ):
-    return schemas.UserDetail(
-        id=current_user.id,
-        name=current_user.name,
-        username=current_user.account[0].username,
-        bio=current_user.bio,
-        avatar_url=current_user.avatar_url,
-        created_at=current_user.created_at.isoformat()
-    )
+    return current_user
 
 
 @router.put("/me", response_model=schemas.UserDetail)
 async def update_user_info(
         user_data: schemas.UserUpdate,
         current_user: Annotated[models.User, Depends(get_current_user)],
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_db, scope="function")
 ):
     updated_user = user_crud.update_user(
         db=db,
@@ -84,20 +75,13 @@ async def update_user_info(
         bio=user_data.bio
     )
     
-    return schemas.UserDetail(
-        id=updated_user.id,
-        name=updated_user.name,
-        username=updated_user.account[0].username,
-        bio=updated_user.bio,
-        avatar_url=updated_user.avatar_url,
-        created_at=updated_user.created_at.isoformat()
-    )
+    return updated_user
 
 @router.post("/me/avatar", response_model=schemas.UserDetail)
 async def upload_avatar(
     current_user: Annotated[models.User, Depends(get_current_user)],
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db, scope="function")
 ):
     # 檢查文件類型
     if not file.content_type.startswith("image/"):
@@ -114,14 +98,7 @@ async def upload_avatar(
             user_id=current_user.id,
             avatar_url=upload_result["public_url"]
         )
-        return schemas.UserDetail(
-            id=updated_user.id,
-            name=updated_user.name,
-            username=updated_user.account[0].username,
-            bio=updated_user.bio,
-            avatar_url=updated_user.avatar_url,
-            created_at=updated_user.created_at.isoformat()
-        )
+        return updated_user
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,13 +1,14 @@
+import asyncio
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 import traceback
 
 from src.crud import user as user_crud
 from src.database import models
 from src.dependencies.auth import authenticate_user
-from src.dependencies.basic import get_db
+from src.dependencies.basic import get_db, get_read_session_factory
 from src.schemas import blog as schemas
 from src.schemas.basic import Token
 from src.utils.credentials import create_access_token
@@ -17,11 +18,12 @@ router = APIRouter()
 @router.post("/login", response_model=Token)
 async def login(
         form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-        db: Session = Depends(get_db),
+        session_factory: sessionmaker = Depends(get_read_session_factory),
 ):
     try:
-        user = authenticate_user(db, form_data.username, form_data.password)
-        token = create_access_token({"sub": user.account[0].username})
+        # 密碼比對會佔用 CPU 數百毫秒，於執行緒中執行以免阻塞事件迴圈
+        user = await asyncio.to_thread(authenticate_user, session_factory, form_data.username, form_data.password)
+        token = create_access_token({"sub": user.account.username})
         return Token(access_token=token, token_type="bearer")
     except Exception as e:
         print(f"登入失敗: {str(e)}")
@@ -35,13 +37,16 @@ async def login(
 @router.post("/register", response_model=schemas.UserDetail, status_code=status.HTTP_201_CREATED)
 async def register(
         user_data: schemas.UserRegister,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_db, scope="function"),
+        session_factory: sessionmaker = Depends(get_read_session_factory)
 ):
     try:
-        # 檢查使用者名稱是否已存在
-        existing_account = db.query(models.UserAccount).filter(
-            models.UserAccount.username == user_data.username
-        ).first()
+        # 檢查使用者名稱是否已存在，以獨立的 Session 查詢並立即歸還連線，
+        # db 在 create_user 雜湊密碼後才取得連線
+        with session_factory() as read_db:
+            existing_account = read_db.query(models.UserAccount).filter(
+                models.UserAccount.username == user_data.username
+            ).first()
         if existing_account:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -49,25 +54,16 @@ async def register(
             )
         
         # 創建新使用者 - 確保db是第一個參數！
-        new_user = user_crud.create_user(
+        # 密碼雜湊會佔用 CPU 數百毫秒，於執行緒中執行以免阻塞事件迴圈
+        new_user = await asyncio.to_thread(
+            user_crud.create_user,
             db=db,  # 確保db是第一個參數
             name=user_data.name,
             username=user_data.username,
             password=user_data.password
         )
         
-        # 檢查返回的user對象是否有所有需要的屬性
-        bio = getattr(new_user, 'bio', None)
-        avatar_url = getattr(new_user, 'avatar_url', None)
-        
-        return schemas.UserDetail(
-            id=new_user.id,
-            name=new_user.name,
-            username=new_user.account[0].username if hasattr(new_user, 'account') and new_user.account else "",
-            bio=bio,
-            avatar_url=avatar_url,
-            created_at=new_user.created_at.isoformat()
-        )
+        return new_user
     except HTTPException:
         raise
     except Exception as e:
@@ -1,12 +1,14 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.crud import blog as blog_crud, taxonomy as taxonomy_crud
-from src.dependencies.basic import get_db
+from src.crud import aio, blog as blog_crud
+from src.dependencies.basic import get_async_db, get_async_read_db
 from src.routers.public import auth
 from src.schemas import blog as schemas
+from src.utils.fieldsets import parse_fields, selectable_fields, sparse_response
+from src.utils.pagination import paginate
 
 router = APIRouter()
 
@@ -21,22 +23,46 @@ async def get_public_blogs(
         tag_id: str = None,
         category_id: str = None,
         search: str = None,
-        db: Session = Depends(get_db)
+        sort: schemas.BlogSortOrder = schemas.BlogSortOrder.LATEST,
+        cursor: str = None,
+        include_total: bool = Query(False, description="是否於 X-Total-Count 回傳總數 (未過濾時以 X-Total-Count-Estimate 回傳包含草稿的估計值)"),
+        fields: str = Query(None, description=f"只回傳指定欄位，以逗號分隔: {','.join(selectable_fields(schemas.BlogSummary))}"),
+        response: Response = None,
+        db: AsyncSession = Depends(get_async_read_db, scope="function")
 ):
     try:
-        # 獲取公開部落格文章列表 (不包括草稿)
-        blogs = blog_crud.get_blogs(
-            db=db,
+        selected = parse_fields(fields, schemas.BlogSummary)
+        
+        # 獲取公開部落格文章列表 (不包括草稿)，多取一筆以判斷是否有下一頁
+        blogs = await aio.blog.get_blogs(
+            db,
             skip=skip,
-            limit=limit,
+            limit=limit + 1,
             tag_id=tag_id,
             category_id=category_id,
             search_term=search,
-            show_drafts=False
+            show_drafts=False,
+            sort=sort,
+            cursor=blog_crud.decode_blog_cursor(cursor, sort),
+            fields=selected
         )
         
-        # 構建響應
-        return [convert_blog_to_summary(blog) for blog in blogs]
+        total = await aio.blog.count_blogs(
+            db,
+            tag_id=tag_id,
+            category_id=category_id,
+            search_term=search
+        ) if include_total else None
+        
+        # 分頁資訊透過 header 回傳，保持響應格式不變
+        blogs = paginate(response, blogs, limit, lambda blog: blog_crud.encode_blog_cursor(blog, sort), total)
+        
+        # 只回傳指定欄位；否則由 response_model 直接讀取 ORM 物件構建響應
+        if selected:
+            return sparse_response(blogs, schemas.BlogSummary, selected, response)
+        return blogs
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         print(f"獲取部落格列表錯誤: {str(e)}")
@@ -50,11 +76,14 @@ async def get_public_blogs(
 @router.get("/blogs/{blog_id}", response_model=schemas.BlogDetail, tags=["部落格"])
 async def get_public_blog(
         blog_id: str,
-        db: Session = Depends(get_db)
+        fields: str = Query(None, description=f"只回傳指定欄位，以逗號分隔: {','.join(selectable_fields(schemas.BlogDetail))}"),
+        db: AsyncSession = Depends(get_async_db, scope="function")
 ):
     try:
+        selected = parse_fields(fields, schemas.BlogDetail)
+        
         # 獲取公開部落格文章詳情 (同時增加瀏覽次數)
-        blog = blog_crud.get_blog_by_id(db, blog_id, increment_view=True)
+        blog = await aio.blog.get_blog_by_id(db, blog_id, increment_view=True, fields=selected)
         
         # 檢查是否為草稿
         if blog.is_draft:
@@ -64,7 +93,9 @@ async def get_public_blog(
             )
         
         # 構建響應
-        return convert_blog_to_detail(blog)
+        if selected:
+            return sparse_response(blog, schemas.BlogDetail, selected)
+        return blog
     except HTTPException:
         raise
     except Exception as e:
@@ -81,102 +112,24 @@ async def get_public_blog(
 async def get_public_categories(
         skip: int = 0,
         limit: int = 100,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_read_db, scope="function")
 ):
     # 獲取所有分類
-    categories = taxonomy_crud.get_categories(db, skip=skip, limit=limit)
+    categories = await aio.taxonomy.get_categories(db, skip=skip, limit=limit)
     
     # 構建響應
-    return [
-        schemas.CategoryDetail(
-            id=category.id,
-            name=category.name,
-            description=category.description
-        )
-        for category in categories
-    ]
+    return categories
 
 
 @router.get("/tags", response_model=List[schemas.TagDetail], tags=["標籤"])
 async def get_public_tags(
         skip: int = 0,
         limit: int = 100,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_read_db, scope="function")
 ):
     # 獲取所有標籤
-    tags = taxonomy_crud.get_tags(db, skip=skip, limit=limit)
+    tags = await aio.taxonomy.get_tags(db, skip=skip, limit=limit)
     
     # 構建響應
-    return [
-        schemas.TagDetail(
-            id=tag.id,
-            name=tag.name
-        )
-        for tag in tags
-    ]
-
+    return tags
 
-# 輔助函數，將Blog模型轉換為BlogDetail
-def convert_blog_to_detail(blog: object) -> schemas.BlogDetail:
-    # 處理作者資訊 - 修正以處理InstrumentedList
-    author = blog.author
-    if isinstance(author, list) and author:
-        # 如果author是一個列表（InstrumentedList），取第一個元素
-        author = author[0]
-    
-    author_detail = schemas.UserDetail(
-        id=author.id,
-        name=author.name,
-        username=author.account[0].username if hasattr(author, 'account') and author.account else "",
-        bio=getattr(author, 'bio', None),
-        avatar_url=getattr(author, 'avatar_url', None),
-        created_at=author.created_at.isoformat()
-    )
-    
-    return schemas.BlogDetail(
-        id=blog.id,
-        title=blog.title,
-        content=blog.content,
-        summary=blog.summary,
-        cover_image_url=blog.cover_image_url,
-        is_draft=blog.is_draft,
-        view_count=blog.view_count,
-        like_count=blog.like_count,
-        created_at=blog.created_at.isoformat(),
-        updated_at=blog.updated_at.isoformat(),
-        author=author_detail,
-        tags=[
-            schemas.TagDetail(id=tag.id, name=tag.name)
-            for tag in blog.tags
-        ],
-        categories=[
-            schemas.CategoryDetail(
-                id=category.id,
-                name=category.name,
-                description=category.description
-            )
-            for category in blog.categories
-        ]
-    )
-
-
-# 輔助函數，將Blog模型轉換為BlogSummary
-def convert_blog_to_summary(blog: object) -> schemas.BlogSummary:
-    # 處理作者資訊 - 修正以處理InstrumentedList
-    author = blog.author
-    if isinstance(author, list) and author:
-        # 如果author是一個列表（InstrumentedList），取第一個元素
-        author = author[0]
-    
-    return schemas.BlogSummary(
-        id=blog.id,
-        title=blog.title,
-        summary=blog.summary,
-        cover_image_url=blog.cover_image_url,
-        created_at=blog.created_at.isoformat(),
-        view_count=blog.view_count,
-        like_count=blog.like_count,
-        author_name=author.name,
-        tags=[tag.name for tag in blog.tags],
-        categories=[category.name for category in blog.categories]
-    )
\ No newline at end of file
@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from src.crud import taxonomy as taxonomy_crud
 from src.database import models
 from src.dependencies.auth import get_admin_user
-from src.dependencies.basic import get_db
+from src.dependencies.basic import get_db, get_read_db
 from src.schemas import blog as schemas
 
 router = APIRouter()
@@ -16,7 +16,7 @@ router = APIRouter()
 async def get_categories(
         skip: int = 0,
         limit: int = 100,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_read_db, scope="function")
 ):
     # 獲取所有分類
     categories = taxonomy_crud.get_categories(db, skip=skip, limit=limit)
@@ -36,7 +36,7 @@ async def get_categories(
 async def create_category(
         category_data: schemas.CategoryCreate,
         _: Annotated[None, Depends(get_admin_user)],
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_db, scope="function")
 ):
     # 檢查分類名稱是否已存在
     try:
@@ -70,7 +70,7 @@ async def update_category(
         category_id: str,
         category_data: schemas.CategoryCreate,
         _: Annotated[None, Depends(get_admin_user)],
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_db, scope="function")
 ):
     # 檢查分類是否存在
     taxonomy_crud.get_category_by_id(db, category_id)
@@ -108,7 +108,7 @@ async def update_category(
 async def delete_category(
         category_id: str,
         _: Annotated[None, Depends(get_admin_user)],
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_db, scope="function")
 ):
     # 刪除分類
     taxonomy_crud.delete_category(db, category_id)
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from src.utils.loop_monitor import loop_monitor
+
+router = APIRouter()
+
+
+@router.get("/loop")
+async def get_loop_stats():
+    # 事件迴圈延遲與阻塞紀錄
+    return loop_monitor.stats()
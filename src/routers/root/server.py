@@ -1,8 +1,9 @@
 from fastapi import APIRouter
 
-from src.routers.root import category
+from src.routers.root import category, runtime
 from src.schemas import blog as schemas
 
 router = APIRouter()
 
-router.include_router(category.router, prefix="/categories", tags=["分類管理"])
\ No newline at end of file
+router.include_router(category.router, prefix="/categories", tags=["分類管理"])
+router.include_router(runtime.router, prefix="/runtime", tags=["執行狀態"])
\ No newline at end of file
@@ -10,4 +10,4 @@ class UserInfo(BaseModel):
 
     @staticmethod
     def from_model(user: models.User) -> "UserInfo":
-        return UserInfo(id=user.id, name=user.name, username=user.account[0].username)
+        return UserInfo(id=user.id, name=user.name, username=user.account.username)
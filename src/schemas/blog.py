@@ -1,6 +1,16 @@
+from datetime import datetime
 from typing import Optional, List
 
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, computed_field, field_validator
+
+from src.schemas import CustomStringEnum
+
+
+class BlogSortOrder(CustomStringEnum):
+    LATEST = "latest"
+    MOST_VIEWED = "most_viewed"
+    MOST_LIKED = "most_liked"
+    RECENTLY_UPDATED = "recently_updated"
 
 
 class TokenData(BaseModel):
@@ -19,13 +29,36 @@ class UserUpdate(BaseModel):
     bio: Optional[str] = Field(None, description="User's biography")
 
 
+# 以下回應模型可直接由 ORM 物件建立 (model_validate 或作為 response_model 回傳)，
+# 欄位由 pydantic-core 一次讀取，不需逐欄位手動轉換
+
+
+class NameOnly(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    name: str = Field(..., description="Name")
+
+
+class UsernameOnly(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    username: str = Field(..., description="Username")
+
+
 class UserDetail(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str = Field(..., description="User ID")
     name: str = Field(..., description="User Name")
-    username: str = Field(..., description="User Account Username")
     bio: Optional[str] = Field(None, description="User's biography")
     avatar_url: Optional[str] = Field(None, description="User's avatar URL")
-    created_at: str = Field(..., description="User creation date")
+    created_at: datetime = Field(..., description="User creation date")
+    account: Optional[UsernameOnly] = Field(None, exclude=True, description="User account")
+
+    @computed_field(description="User Account Username")
+    @property
+    def username(self) -> str:
+        return self.account.username if self.account else ""
 
 
 class BlogCreate(BaseModel):
@@ -49,6 +82,8 @@ class BlogUpdate(BaseModel):
 
 
 class BlogDetail(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str = Field(..., description="Blog ID")
     title: str = Field(..., description="Blog title")
     content: str = Field(..., description="Blog content")
@@ -57,25 +92,40 @@ class BlogDetail(BaseModel):
     is_draft: bool = Field(..., description="Is this a draft")
     view_count: int = Field(..., description="View count")
     like_count: int = Field(..., description="Like count")
-    created_at: str = Field(..., description="Creation date")
-    updated_at: str = Field(..., description="Last update date")
+    created_at: datetime = Field(..., description="Creation date")
+    updated_at: datetime = Field(..., description="Last update date")
     author: UserDetail = Field(..., description="Blog author")
     tags: List["TagDetail"] = Field(default=[], description="Blog tags")
     categories: List["CategoryDetail"] = Field(default=[], description="Blog categories")
 
 
 class BlogSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str = Field(..., description="Blog ID")
     title: str = Field(..., description="Blog title")
     summary: Optional[str] = Field(None, description="Blog summary")
     cover_image_url: Optional[str] = Field(None, description="Cover image URL")
-    created_at: str = Field(..., description="Creation date")
+    created_at: datetime = Field(..., description="Creation date")
     view_count: int = Field(..., description="View count")
     like_count: int = Field(..., description="Like count")
-    author_name: str = Field(..., description="Author name")
+    comment_count: int = Field(0, description="Comment count")
+    last_comment_at: Optional[datetime] = Field(None, description="Latest comment date")
+    author: Optional[NameOnly] = Field(None, exclude=True, description="Blog author")
     tags: List[str] = Field(default=[], description="Tag names")
     categories: List[str] = Field(default=[], description="Category names")
 
+    @field_validator("tags", "categories", mode="before")
+    @classmethod
+    def to_names(cls, value):
+        # 由 ORM 物件建立時只取名稱
+        return [getattr(item, "name", item) for item in value or []]
+
+    @computed_field(description="Author name")
+    @property
+    def author_name(self) -> str:
+        return self.author.name if self.author else "未知用戶"
+
 
 class CommentCreate(BaseModel):
     content: str = Field(..., description="Comment content")
@@ -84,10 +134,13 @@ class CommentCreate(BaseModel):
 
 
 class CommentDetail(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str = Field(..., description="Comment ID")
     content: str = Field(..., description="Comment content")
-    created_at: str = Field(..., description="Creation date")
+    created_at: datetime = Field(..., description="Creation date")
     user: UserDetail = Field(..., description="Comment author")
+    reply_count: int = Field(0, description="Number of direct replies")
     replies: List["CommentDetail"] = Field(default=[], description="Replies to this comment")
 
 
@@ -96,6 +149,8 @@ class TagCreate(BaseModel):
 
 
 class TagDetail(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str = Field(..., description="Tag ID")
     name: str = Field(..., description="Tag name")
 
@@ -106,6 +161,8 @@ class CategoryCreate(BaseModel):
 
 
 class CategoryDetail(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str = Field(..., description="Category ID")
     name: str = Field(..., description="Category name")
     description: Optional[str] = Field(None, description="Category description")
@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class QueryStat(BaseModel):
+    statement: str = Field(..., description="SQL statement")
+    calls: int = Field(..., description="Number of executions")
+    total_ms: float = Field(..., description="Total execution time in milliseconds")
+    avg_ms: float = Field(..., description="Average execution time in milliseconds")
+    max_ms: float = Field(..., description="Slowest execution time in milliseconds")
+    last_seen: datetime = Field(..., description="Last execution time")
+
+
+class ConnectionHoldStat(BaseModel):
+    route: str = Field(..., description="Route that checked out the connection")
+    checkouts: int = Field(..., description="Number of connection checkouts")
+    total_ms: float = Field(..., description="Total time connections were held in milliseconds")
+    avg_ms: float = Field(..., description="Average time a connection was held in milliseconds")
+    max_ms: float = Field(..., description="Longest time a connection was held in milliseconds")
+
+
+class PoolStat(BaseModel):
+    name: str = Field(..., description="Engine name, e.g. primary or replica:<host>")
+    size: Optional[int] = Field(None, description="Configured pool size")
+    checked_in: Optional[int] = Field(None, description="Idle connections in the pool")
+    checked_out: Optional[int] = Field(None, description="Connections currently in use")
+    overflow: Optional[int] = Field(None, description="Current overflow, negative while the pool is not yet full")
+    checkouts: int = Field(..., description="Number of successful checkouts")
+    wait_total_ms: float = Field(..., description="Total time spent obtaining connections in milliseconds")
+    wait_avg_ms: float = Field(..., description="Average time to obtain a connection in milliseconds")
+    wait_max_ms: float = Field(..., description="Longest time to obtain a connection in milliseconds")
+    timeouts: int = Field(..., description="Checkouts that failed with a pool timeout")
+    connections_created: int = Field(..., description="New DBAPI connections opened")
+    invalidations: int = Field(..., description="Connections invalidated after errors")
+    age_avg_s: float = Field(..., description="Average connection age at checkout in seconds")
+    age_max_s: float = Field(..., description="Oldest connection age at checkout in seconds")
+
+
+class PlanTable(BaseModel):
+    table: str = Field(..., description="Table name")
+    access_type: str = Field(..., description="Access type, ALL means full table scan")
+    key: Optional[str] = Field(None, description="Index used")
+    rows_examined_per_scan: Optional[int] = Field(None, description="Estimated rows examined per scan")
+
+
+class QueryPlan(QueryStat):
+    rows_examined: Optional[int] = Field(None, description="Estimated rows examined across all tables")
+    full_scan: Optional[bool] = Field(None, description="Whether any table is fully scanned")
+    query_cost: Optional[str] = Field(None, description="Optimizer query cost")
+    tables: List[PlanTable] = Field(default=[], description="Per-table access plan")
+    plan: Optional[Dict[str, Any]] = Field(None, description="Raw EXPLAIN FORMAT=JSON output")
+    error: Optional[str] = Field(None, description="Error raised while explaining the statement")
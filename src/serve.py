@@ -0,0 +1,141 @@
+import gc
+import logging
+import os
+import signal
+import sys
+import time
+
+import uvicorn
+
+logger = logging.getLogger("uvicorn.error")
+
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+# worker 數，預設為 CPU 核心數；連線池的連線預算 (DB_CONNECTION_BUDGET) 也依此平分
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+# 閒置的 keep-alive 連線保留秒數，放在負載平衡器之後時應大於其閒置逾時
+SERVER_KEEP_ALIVE = int(os.getenv("SERVER_KEEP_ALIVE", "5"))
+# 收到 SIGTERM 後等待進行中請求完成的秒數，逾時則強制結束
+SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+# 每個 worker 處理此數量的請求後重啟 (0 表示不重啟)，避免記憶體持續成長
+SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "0"))
+
+
+class PreforkServer:
+    """
+    正式環境的啟動程式: 主行程先載入應用程式再 fork 出多個 worker
+
+    - 載入後執行 gc.freeze()，讓 worker 以 copy-on-write 共用已載入的模組與物件
+    - 各 worker 使用 uvloop 與 httptools，共用主行程綁定的 socket
+    - 收到 SIGTERM/SIGINT 時轉送給 worker，worker 停止接受新連線並等待進行中的請求完成
+    - worker 意外結束或達到 SERVER_MAX_REQUESTS 時由主行程補上
+    """
+
+    def __init__(self, config: uvicorn.Config, workers: int, graceful_timeout: int):
+        self.config = config
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+
+        self.children = {}
+        self.shutting_down = False
+
+    def run(self) -> None:
+        sock = self.config.bind_socket()
+
+        # fork 前凍結目前的物件，之後的 GC 不再掃描 (寫入) 這些物件，記憶體分頁得以共用
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self.handle_exit)
+        signal.signal(signal.SIGINT, self.handle_exit)
+        signal.signal(signal.SIGALRM, self.handle_timeout)
+        for _ in range(self.workers):
+            self.spawn(sock)
+
+        while self.children:
+            pid, status = os.wait()
+            self.children.pop(pid, None)
+            if self.shutting_down:
+                continue
+
+            logger.warning("Worker %s exited with status %s, starting a new one", pid, os.waitstatus_to_exitcode(status))
+            # 避免 worker 啟動即失敗時不斷重啟
+            time.sleep(1)
+            if not self.shutting_down:
+                self.spawn(sock)
+
+        sock.close()
+        logger.info("All workers stopped")
+
+    def spawn(self, sock) -> None:
+        pid = os.fork()
+        if pid:
+            self.children[pid] = True
+            return
+
+        # worker: 還原主行程的訊號處理，交由 uvicorn 處理 SIGTERM/SIGINT
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGALRM, signal.SIG_DFL)
+        gc.enable()
+
+        exit_code = 0
+        try:
+            uvicorn.Server(self.config).run(sockets=[sock])
+        except BaseException:
+            logger.exception("Worker %s crashed", os.getpid())
+            exit_code = 1
+        finally:
+            # 不執行主行程的清理程序 (atexit 等)
+            os._exit(exit_code)
+
+    def handle_exit(self, sig, frame) -> None:
+        if self.shutting_down:
+            return
+        self.shutting_down = True
+        logger.info("Received %s, draining %d workers", signal.Signals(sig).name, len(self.children))
+
+        for pid in list(self.children):
+            self.signal_child(pid, signal.SIGTERM)
+        # worker 本身會在 graceful timeout 後中止請求，這裡多保留一些時間給 lifespan 關閉
+        signal.alarm(self.graceful_timeout + 5)
+
+    def handle_timeout(self, sig, frame) -> None:
+        for pid in list(self.children):
+            logger.warning("Worker %s did not stop in time, killing it", pid)
+            self.signal_child(pid, signal.SIGKILL)
+
+    @staticmethod
+    def signal_child(pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+
+def main() -> None:
+    # 讓資料庫設定以相同的 worker 數分配連線預算
+    os.environ["WEB_CONCURRENCY"] = str(WEB_CONCURRENCY)
+
+    # 載入期間停用 GC，避免產生的物件被移到較老的世代後又在 fork 後被寫入
+    gc.disable()
+    from src.server import app
+
+    config = uvicorn.Config(
+        app,
+        host=SERVER_HOST,
+        port=SERVER_PORT,
+        loop="uvloop",
+        http="httptools",
+        lifespan="on",
+        backlog=SERVER_BACKLOG,
+        timeout_keep_alive=SERVER_KEEP_ALIVE,
+        timeout_graceful_shutdown=SERVER_GRACEFUL_TIMEOUT,
+        limit_max_requests=SERVER_MAX_REQUESTS or None,
+    )
+    logger.info("Starting %d workers on %s:%d", WEB_CONCURRENCY, SERVER_HOST, SERVER_PORT)
+    PreforkServer(config, WEB_CONCURRENCY, SERVER_GRACEFUL_TIMEOUT).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,51 @@
+import time
+
+# 匯入計時從這裡開始，涵蓋 FastAPI、SQLAlchemy 與所有路由的載入
+_import_started = time.perf_counter()
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 from starlette.requests import Request
 
+from src.database.database import DB_POOL_PREWARM, database
+from src.database.pool_metrics import PoolMetricsMiddleware
+from src.database.routing import ReadYourWritesMiddleware
 from src.routers.server import router
 from src.schemas.basic import TextOnly
-from src.utils.swagger import custom_swagger_ui_html
+from src.utils.loop_monitor import LOOP_MONITOR_ENABLED, LoopMonitorMiddleware, loop_monitor
+from src.utils.negotiation import MessagePackMiddleware
+
+logger = logging.getLogger(__name__)
+
+# 匯入時間超過此毫秒數時記錄警告，自動擴展時冷啟動時間即為請求延遲
+STARTUP_IMPORT_BUDGET_MS = int(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500"))
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # 建立 engine 並預熱連線池後才開始接受請求
+    init_started = time.perf_counter()
+    await asyncio.to_thread(database.init)
+    await database.warm_up(DB_POOL_PREWARM)
+    init_ms = (time.perf_counter() - init_started) * 1000
+
+    if IMPORT_MS > STARTUP_IMPORT_BUDGET_MS:
+        logger.warning("Import took %.0fms, over the %dms budget", IMPORT_MS, STARTUP_IMPORT_BUDGET_MS)
+    logger.info("Startup: import %.0fms, database init %.0fms", IMPORT_MS, init_ms)
+
+    if LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    yield
+    if LOOP_MONITOR_ENABLED:
+        await loop_monitor.stop()
+    await database.dispose()
+
 
 app = FastAPI(
     title="Blog FastAPI Backend Server",
@@ -15,7 +55,8 @@ app = FastAPI(
         "name": "Sabrina You",
         "email": "example@exmaple.com",
     },
-    docs_url=None
+    docs_url=None,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -24,13 +65,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Has-More", "X-Total-Count", "X-Total-Count-Estimate"],
 )
 
+app.add_middleware(MessagePackMiddleware)
+app.add_middleware(LoopMonitorMiddleware)
+app.add_middleware(PoolMetricsMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
+
 app.include_router(router)
 
 
 @app.get("/docs", include_in_schema=False)
 async def custom_docs():
+    # Swagger UI 的樣板只在開啟文件時才需要
+    from src.utils.swagger import custom_swagger_ui_html
+
     return custom_swagger_ui_html(
         openapi_url=app.openapi_url,
         title=app.title + " - Swagger UI",
@@ -68,3 +118,6 @@ async def api_documentation(request: Request):
 
   </body>
 </html>""")
+
+
+IMPORT_MS = (time.perf_counter() - _import_started) * 1000
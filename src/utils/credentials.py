@@ -1,26 +1,32 @@
 from datetime import datetime, timedelta, timezone
-
-from jose import jwt
-from passlib.context import CryptContext
+from functools import lru_cache
 
 from src.utils.handler import handle_jwt_error
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 SECRET_KEY = "c1b3e4b3-4b3c-4b3e-8b3c-4b3e4b3c4b3e"
 ALGORITHM = "HS256"
 EXPIRE_IN_MIN = 30
 
 
+# passlib/bcrypt 與 jose 於第一次使用時才載入，不佔用 worker 啟動時間
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, period=timedelta(minutes=EXPIRE_IN_MIN)) -> str:
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + period
     to_encode.update({"exp": expire})
@@ -31,4 +37,6 @@ def create_access_token(data: dict, period=timedelta(minutes=EXPIRE_IN_MIN)) ->
 
 @handle_jwt_error
 def decode_token(token: str) -> dict:
+    from jose import jwt
+
     return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -0,0 +1,70 @@
+from functools import lru_cache
+from typing import Any, FrozenSet, List, Optional, Type, Union
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel, TypeAdapter, create_model
+from sqlalchemy import inspect
+
+
+def selectable_fields(model: Type[BaseModel]) -> List[str]:
+    """
+    可透過 fields= 選取的欄位: 會輸出的欄位與計算欄位
+    """
+    fields = [name for name, info in model.model_fields.items() if not info.exclude]
+    return fields + list(model.model_computed_fields)
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[FrozenSet[str]]:
+    """
+    解析以逗號分隔的 fields 參數，未指定時回傳 None (回傳完整欄位)，包含未知欄位時回傳 400
+    """
+    if not fields:
+        return None
+
+    names = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    unknown = names - set(selectable_fields(model))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+
+    return names or None
+
+
+@lru_cache(maxsize=None)
+def _partial_adapter(model: Type[BaseModel], many: bool) -> TypeAdapter:
+    # 所有欄位改為選填，未載入的欄位以 None 代替，輸出時再以 include 篩選
+    partial = create_model(
+        f"Partial{model.__name__}",
+        __base__=model,
+        **{name: (Optional[info.annotation], None) for name, info in model.model_fields.items()}
+    )
+    return TypeAdapter(List[partial] if many else partial)
+
+
+def sparse_response(
+        items: Union[Any, List[Any]],
+        model: Type[BaseModel],
+        fields: FrozenSet[str],
+        response: Optional[Response] = None
+) -> Response:
+    """
+    只輸出 fields 指定的欄位
+
+    只讀取 ORM 物件已載入的屬性 (inspect(obj).dict)，未選取而未載入的欄位與關聯不會觸發查詢。
+    直接回傳 Response 時 FastAPI 不會合併注入的 response，因此複製其 header (例如分頁資訊)
+    """
+    many = isinstance(items, list)
+    adapter = _partial_adapter(model, many)
+
+    data = [inspect(item).dict for item in items] if many else inspect(items).dict
+    content = adapter.dump_json(
+        adapter.validate_python(data, from_attributes=True),
+        include={"__all__": set(fields)} if many else set(fields)
+    )
+
+    headers = {
+        key: value for key, value in response.headers.items() if key != "content-length"
+    } if response is not None else None
+    return Response(content=content, media_type="application/json", headers=headers)
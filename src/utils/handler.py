@@ -2,8 +2,7 @@ from functools import wraps
 from typing import Any, Callable
 
 from fastapi import HTTPException, status
-from jose import JWTError
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.orm import Session
 
 
@@ -41,6 +40,10 @@ def handle_error(func: Callable[..., Any]):
         
         try:
             return func(*args, **kwargs)
+        except HTTPException:
+            # 函數內主動拋出的 HTTP 錯誤 (例如 404/400) 保留原本的狀態碼
+            db.rollback()
+            raise
         except IntegrityError as e:
             db.rollback()
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
@@ -51,9 +54,34 @@ def handle_error(func: Callable[..., Any]):
     return wrapper
 
 
+def retry_on_disconnect(func: Callable[..., Any]):
+    """
+    連線失效時 rollback 並重試一次，僅用於冪等的讀取函數
+    
+    呼叫前已在交易中 (例如由寫入流程呼叫) 時不重試，避免交易中先前的寫入遺失後仍繼續執行
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        db = args[0] if len(args) > 0 else kwargs.get('db')
+        retryable = not db.in_transaction()
+        
+        try:
+            return func(*args, **kwargs)
+        except DBAPIError as e:
+            if not (retryable and e.connection_invalidated):
+                raise
+            db.rollback()
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
 def handle_jwt_error(func: Callable):
     @wraps(func)
     def wrapper(*args, **kwargs):
+        from jose import JWTError
+
         try:
             return func(*args, **kwargs)
         except JWTError:
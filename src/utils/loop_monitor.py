@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+LOOP_MONITOR_INTERVAL_MS = int(os.getenv("LOOP_MONITOR_INTERVAL_MS", "100"))
+LOOP_BLOCK_THRESHOLD_MS = int(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "200"))
+# 嚴格模式下，阻塞事件迴圈的請求會直接拋出錯誤 (測試環境使用)
+LOOP_MONITOR_STRICT = os.getenv("LOOP_MONITOR_STRICT", "false").lower() == "true"
+
+
+class LoopBlockedError(RuntimeError):
+    pass
+
+
+class LoopMonitor:
+    """
+    持續量測事件迴圈延遲，並以監控執行緒偵測長時間佔用事件迴圈的請求
+
+    - 迴圈內的 task 每 interval 醒來一次，實際經過時間與 interval 的差即為延遲
+    - 監控執行緒發現心跳超過 threshold 未更新時，擷取事件迴圈執行緒的堆疊並記錄當下執行中的路由
+    """
+
+    def __init__(self, interval_ms: int, threshold_ms: int, strict: bool = False, history: int = 600):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.strict = strict
+
+        self._samples: deque = deque(maxlen=history)
+        self._blocks: deque = deque(maxlen=50)
+        self._block_count = 0
+        self._max_lag = 0.0
+
+        self._requests: Dict[asyncio.Task, str] = {}
+        self._blocked_tasks: "set[asyncio.Task]" = set()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._reported = False
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+
+        self._task = self._loop.create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _measure(self) -> None:
+        while True:
+            start = self._loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(self._loop.time() - start - self.interval, 0.0)
+
+            self._samples.append(lag)
+            self._max_lag = max(self._max_lag, lag)
+            self._heartbeat = time.monotonic()
+            self._reported = False
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.threshold / 2):
+            stalled = time.monotonic() - self._heartbeat - self.interval
+            if stalled < self.threshold or self._reported:
+                continue
+
+            # 同一次阻塞只記錄一次，待下次心跳後重置
+            self._reported = True
+            self._record_block(stalled)
+
+    def _record_block(self, stalled: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame else ""
+
+        # 正在執行 (而非等待中) 的請求即為阻塞事件迴圈者
+        route = None
+        for task, path in list(self._requests.items()):
+            coro = task.get_coro()
+            if getattr(coro, "cr_running", False):
+                route = path
+                self._blocked_tasks.add(task)
+                break
+
+        self._block_count += 1
+        self._blocks.append({
+            "route": route,
+            "blocked_ms": round(stalled * 1000, 1),
+            "at": time.time(),
+            "stack": stack,
+        })
+        logger.warning(
+            "Event loop blocked for %.1fms by %s\n%s", stalled * 1000, route or "unknown callback", stack
+        )
+
+    def track_request(self, path: str) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            self._requests[task] = path
+
+    def finish_request(self) -> None:
+        task = asyncio.current_task()
+        self._requests.pop(task, None)
+        if task in self._blocked_tasks:
+            self._blocked_tasks.discard(task)
+            if self.strict:
+                raise LoopBlockedError(f"Request blocked the event loop for more than {self.threshold * 1000:.0f}ms")
+
+    def stats(self) -> Dict[str, Any]:
+        samples = sorted(self._samples)
+
+        def percentile(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(int(len(samples) * p), len(samples) - 1)] * 1000, 3)
+
+        return {
+            "current_lag_ms": round(self._samples[-1] * 1000, 3) if self._samples else None,
+            "p50_lag_ms": percentile(0.5),
+            "p99_lag_ms": percentile(0.99),
+            "max_lag_ms": round(self._max_lag * 1000, 3),
+            "threshold_ms": self.threshold * 1000,
+            "block_count": self._block_count,
+            "recent_blocks": list(self._blocks)[-10:],
+        }
+
+
+loop_monitor = LoopMonitor(LOOP_MONITOR_INTERVAL_MS, LOOP_BLOCK_THRESHOLD_MS, LOOP_MONITOR_STRICT)
+
+
+class LoopMonitorMiddleware:
+    """
+    記錄每個請求所屬的 task，讓監控執行緒能找出阻塞事件迴圈的路由
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not LOOP_MONITOR_ENABLED:
+            return await self.app(scope, receive, send)
+
+        loop_monitor.track_request(f"{scope['method']} {scope['path']}")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            loop_monitor.finish_request()
@@ -0,0 +1,96 @@
+import json
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import msgpack
+except ImportError:  # 未安裝時只提供 JSON
+    msgpack = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def _accept_quality(accept: str, media_types) -> float:
+    best = 0.0
+    for part in accept.split(","):
+        media_type, *params = part.strip().split(";")
+        if media_type.strip().lower() not in media_types:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        best = max(best, quality)
+    return best
+
+
+def wants_msgpack(accept: str) -> bool:
+    """
+    Accept 中 MessagePack 的權重不低於 JSON 時回傳 MessagePack
+    """
+    if "msgpack" not in accept:
+        return False
+    msgpack_quality = _accept_quality(accept, MSGPACK_MEDIA_TYPES)
+    return msgpack_quality > 0 and msgpack_quality >= _accept_quality(accept, ("application/json",))
+
+
+class MessagePackMiddleware:
+    """
+    依 Accept 協商回應格式，內部服務可要求 application/msgpack 以減少傳輸量與解析成本
+
+    JSON 仍由 FastAPI 依 response_model 以 pydantic-core 直接序列化，
+    只有要求 MessagePack 的請求才將 JSON 回應轉為 MessagePack，其餘請求僅加上 Vary: Accept
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or msgpack is None:
+            return await self.app(scope, receive, send)
+
+        if not wants_msgpack(Headers(scope=scope).get("accept", "").lower()):
+            async def send_with_vary(message):
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    if headers.get("content-type", "").startswith("application/json"):
+                        headers.add_vary_header("Accept")
+                await send(message)
+
+            return await self.app(scope, receive, send_with_vary)
+
+        start_message = None
+        body = []
+
+        async def send_msgpack(message):
+            nonlocal start_message
+
+            if message["type"] == "http.response.start":
+                if MutableHeaders(scope=message).get("content-type", "").startswith("application/json"):
+                    # 等收到完整內容後再送出，以便更新 content-length
+                    start_message = message
+                    return
+            elif message["type"] == "http.response.body" and start_message is not None:
+                body.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+
+                content = b"".join(body)
+                headers = MutableHeaders(scope=start_message)
+                if content:
+                    content = msgpack.packb(json.loads(content))
+                    headers["content-type"] = "application/msgpack"
+                    headers["content-length"] = str(len(content))
+                headers.add_vary_header("Accept")
+
+                await send(start_message)
+                await send({"type": "http.response.body", "body": content})
+                return
+
+            await send(message)
+
+        await self.app(scope, receive, send_msgpack)
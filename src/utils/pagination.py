@@ -0,0 +1,66 @@
+import base64
+import binascii
+import json
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, TypeVar
+
+from fastapi import HTTPException, Response, status
+
+T = TypeVar("T")
+
+
+class Total(NamedTuple):
+    """
+    列表總數，estimated 為 True 時是估計值 (以 X-Total-Count-Estimate 回傳)
+    """
+    count: int
+    estimated: bool = False
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """
+    將分頁位置編碼為不透明的 cursor 字串
+    """
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    解析 cursor 字串，格式錯誤時回傳 400
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    if not isinstance(values, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    return values
+
+
+def paginate(
+        response: Response,
+        items: List[T],
+        limit: int,
+        encode: Callable[[T], str],
+        total: Optional[Total] = None
+) -> List[T]:
+    """
+    以多查詢一筆 (limit + 1) 的結果判斷是否還有下一頁，設定分頁 header 並回傳本頁資料
+    """
+    has_more = len(items) > limit
+    items = items[:limit]
+
+    response.headers["X-Has-More"] = "true" if has_more else "false"
+    if has_more and items:
+        response.headers["X-Next-Cursor"] = encode(items[-1])
+    if total is not None:
+        header = "X-Total-Count-Estimate" if total.estimated else "X-Total-Count"
+        response.headers[header] = str(total.count)
+
+    return items
@@ -1,21 +1,11 @@
 import os
 import time
+from functools import lru_cache
 from tempfile import NamedTemporaryFile
 from typing import Dict, Any
 
-import boto3
-from botocore.config import Config
 from fastapi import UploadFile
 
-# S3客戶端
-s3 = boto3.client(
-    's3',
-    aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-    aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-    region_name=os.getenv('AWS_REGION'),
-    config=Config(s3={"use_accelerate_endpoint": False})
-)
-
 # S3 Bucket名稱
 S3_BUCKET = os.getenv('AWS_S3_BUCKET', '')
 
@@ -23,6 +13,23 @@ S3_BUCKET = os.getenv('AWS_S3_BUCKET', '')
 CLOUDFRONT_DOMAIN = os.getenv('CLOUDFRONT_DOMAIN', '')
 
 
+@lru_cache(maxsize=None)
+def get_s3_client():
+    """
+    S3客戶端，第一次上傳時才載入 boto3 並建立，避免拖慢 worker 啟動
+    """
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client(
+        's3',
+        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+        region_name=os.getenv('AWS_REGION'),
+        config=Config(s3={"use_accelerate_endpoint": False})
+    )
+
+
 def upload_file_to_s3(file: UploadFile, folder: str = "uploads") -> Dict[str, Any]:
     """
     將文件上傳到S3
@@ -42,7 +49,7 @@ def upload_file_to_s3(file: UploadFile, folder: str = "uploads") -> Dict[str, An
             temp_file.flush()
             
             # 上傳到S3
-            s3.upload_file(
+            get_s3_client().upload_file(
                 temp_file.name,
                 S3_BUCKET,
                 s3_filename,
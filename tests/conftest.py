@@ -0,0 +1,209 @@
+import os
+
+# 測試使用 SQLite，並讓所有未預先載入的關聯在存取時直接拋出錯誤
+os.environ.setdefault("DB_HOST", "127.0.0.1")
+os.environ["DB_STRICT_LOADING"] = "true"
+# lifespan 初始化的 engine 改指向測試用的 SQLite (見 app fixture)，不需建立 MySQL 資料庫
+os.environ["DB_CREATE_DATABASE"] = "false"
+os.environ.setdefault("DB_POOL_PREWARM", "2")
+# lifespan 啟動的事件迴圈監控使用嚴格模式，阻塞事件迴圈的請求直接失敗
+os.environ["LOOP_MONITOR_ENABLED"] = "true"
+os.environ["LOOP_MONITOR_STRICT"] = "true"
+
+import sqlite3
+from contextlib import contextmanager
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from ulid import ULID
+
+from src.crud import user as user_crud
+from src.database import models
+from src.database.routing import RoutingSession
+from src.dependencies.basic import get_async_db, get_async_read_db, get_db, get_read_db, get_read_session_factory
+from src.utils.credentials import create_access_token
+
+
+class QueryCounter:
+    """
+    以 before_cursor_execute 記錄實際送出的 SQL
+    """
+
+    def __init__(self):
+        self.statements: List[str] = []
+        self.enabled = False
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.record(statement)
+
+    def record(self, statement: str) -> None:
+        if self.enabled:
+            self.statements.append(statement)
+
+    @contextmanager
+    def count(self):
+        self.statements = []
+        self.enabled = True
+        try:
+            yield self
+        finally:
+            self.enabled = False
+
+    def __len__(self):
+        return len(self.statements)
+
+
+def transaction_recording_connection(counter: QueryCounter):
+    """
+    建立記錄交易語句的 sqlite3 連線類別，作為 connect_args 的 factory
+
+    commit / rollback 記錄 DBAPI 層級的呼叫 (MySQL 上每次都是一次往返)，
+    隱含送出的 BEGIN 不經過 cursor，以 trace callback 取得
+    """
+
+    class TransactionRecordingConnection(sqlite3.Connection):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.set_trace_callback(self._trace)
+
+        def _trace(self, statement: str) -> None:
+            if statement.startswith("BEGIN"):
+                counter.record("BEGIN")
+
+        def commit(self):
+            counter.record("COMMIT")
+            super().commit()
+
+        def rollback(self):
+            counter.record("ROLLBACK")
+            super().rollback()
+
+    return TransactionRecordingConnection
+
+
+@pytest.fixture(scope="session")
+def query_counter():
+    return QueryCounter()
+
+
+@pytest.fixture(scope="session")
+def transaction_counter():
+    return QueryCounter()
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory, query_counter, transaction_counter):
+    url = f"sqlite:///{tmp_path_factory.mktemp('db') / 'test.db'}"
+    async_url = url.replace("sqlite://", "sqlite+aiosqlite://")
+    connect_args = {"factory": transaction_recording_connection(transaction_counter)}
+
+    engine = create_engine(url, connect_args={**connect_args, "check_same_thread": False})
+    read_engine = create_engine(
+        url,
+        connect_args={**connect_args, "check_same_thread": False},
+        isolation_level="AUTOCOMMIT",
+        skip_autocommit_rollback=True
+    )
+    async_engine = create_async_engine(async_url, connect_args=connect_args)
+    async_read_engine = create_async_engine(
+        async_url,
+        connect_args=connect_args,
+        isolation_level="AUTOCOMMIT",
+        skip_autocommit_rollback=True
+    )
+    for target in (engine, read_engine, async_engine.sync_engine, async_read_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", query_counter)
+
+    models.Base.metadata.create_all(engine)
+
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    ReadSessionLocal = sessionmaker(autoflush=False, bind=read_engine, class_=RoutingSession, read_only=True)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    AsyncReadSessionLocal = async_sessionmaker(
+        async_read_engine,
+        autoflush=False,
+        expire_on_commit=False,
+        sync_session_class=RoutingSession,
+        read_only=True
+    )
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def override_get_read_db():
+        db = ReadSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    async def override_get_async_read_db():
+        async with AsyncReadSessionLocal() as db:
+            yield db
+
+    from src.database import database as database_module
+    from src.server import app
+
+    # lifespan 的 database.init 與 warm_up 使用同一個 SQLite 檔案，路由仍透過下方的依賴覆寫取得 Session
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setattr(database_module, "SQLALCHEMY_DATABASE_URL", url)
+    monkeypatch.setattr(database_module, "ASYNC_SQLALCHEMY_DATABASE_URL", async_url)
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    app.dependency_overrides[get_read_session_factory] = lambda: ReadSessionLocal
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_read_db
+    app.state.test_session = SessionLocal
+
+    yield app
+
+    app.dependency_overrides.clear()
+    monkeypatch.undo()
+    engine.dispose()
+    read_engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    # 進入 lifespan: 初始化資料庫並預熱連線池、以嚴格模式啟動事件迴圈監控
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def db(app):
+    db = app.state.test_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="session")
+def user(app):
+    db = app.state.test_session()
+    try:
+        username = f"user_{ULID()}"
+        user = user_crud.create_user(db, name="tester", username=username, password="password", user_id=str(ULID()))
+        return {"id": user.id, "username": username}
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="session")
+def auth_headers(user):
+    return {"Authorization": f"Bearer {create_access_token({'sub': user['username']})}"}
+
@@ -0,0 +1,46 @@
+from typing import List, Optional
+
+from ulid import ULID
+
+from src.crud import blog as blog_crud, comment as comment_crud, taxonomy as taxonomy_crud
+
+# crud 的預設 ID 於載入時即固定，測試資料一律明確指定 ID
+
+
+def create_blog(
+        db,
+        author_id: str,
+        tag_ids: Optional[List[str]] = None,
+        category_ids: Optional[List[str]] = None,
+        is_draft: bool = False
+) -> str:
+    blog = blog_crud.create_blog(
+        db,
+        author_id=author_id,
+        title="title",
+        content="content",
+        is_draft=is_draft,
+        tag_ids=tag_ids,
+        category_ids=category_ids,
+        blog_id=str(ULID())
+    )
+    return blog.id
+
+
+def create_tag(db) -> str:
+    return taxonomy_crud.create_tag(db, name=f"tag_{ULID()}", tag_id=str(ULID())).id
+
+
+def create_category(db) -> str:
+    return taxonomy_crud.create_category(db, name=f"category_{ULID()}", category_id=str(ULID())).id
+
+
+def create_comment(db, user_id: str, blog_id: str, parent_id: Optional[str] = None) -> str:
+    return comment_crud.create_comment(
+        db,
+        user_id=user_id,
+        blog_id=blog_id,
+        content="content",
+        parent_id=parent_id,
+        comment_id=str(ULID())
+    ).id
@@ -0,0 +1,31 @@
+from ulid import ULID
+
+
+def test_register_login_and_me(client):
+    username = f"user_{ULID()}"
+    payload = {"name": f"name_{ULID()}", "username": username, "password": "password"}
+    
+    response = client.post("/public/auth/register", json=payload)
+    assert response.status_code == 201
+    
+    # 使用者名稱重複
+    response = client.post("/public/auth/register", json=payload)
+    assert response.status_code == 400
+    
+    response = client.post("/public/auth/login", data={"username": username, "password": "wrong"})
+    assert response.status_code == 401
+    
+    response = client.post("/public/auth/login", data={"username": username, "password": "password"})
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    
+    response = client.get("/private/users/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["username"] == username
+
+
+def test_private_route_keeps_its_own_session(client, auth_headers, user):
+    # 認證使用獨立的 Session，路由透過 get_read_db 取得的 Session 不會在認證後被關閉
+    response = client.get("/private/blogs", params={"author_id": user["id"]}, headers=auth_headers)
+    
+    assert response.status_code == 200
@@ -0,0 +1,16 @@
+import pytest
+
+DIAGNOSTIC_ROUTES = [
+    ("GET", "/db/queries"),
+    ("GET", "/db/queries/explain"),
+    ("DELETE", "/db/queries"),
+    ("GET", "/db/pool"),
+    ("GET", "/db/connections"),
+    ("DELETE", "/db/connections"),
+]
+
+
+@pytest.mark.parametrize("method, path", DIAGNOSTIC_ROUTES)
+def test_diagnostic_routes_require_super_admin(client, method, path):
+    assert client.request(method, path).status_code == 401
+    assert client.request(method, path, headers={"X-SUPER-ADMIN-TOKEN": "wrong"}).status_code == 401
@@ -0,0 +1,14 @@
+from src.database.database import POOL_SETTINGS, database
+from src.server import DB_POOL_PREWARM
+
+
+def test_lifespan_prewarms_read_pool(client):
+    # client fixture 已進入 lifespan，database.init 與 warm_up 皆已執行
+    assert database._initialized
+    assert database.async_read_engine.dialect.name == "sqlite"
+    
+    expected = min(DB_POOL_PREWARM, POOL_SETTINGS["pool_size"])
+    assert expected > 0
+    pool = database.async_read_engine.pool
+    assert pool.checkedin() == expected
+    assert pool.checkedout() == 0
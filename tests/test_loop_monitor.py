@@ -0,0 +1,46 @@
+import asyncio
+import time
+
+import pytest
+
+from src.utils.loop_monitor import LoopBlockedError, loop_monitor
+
+
+@pytest.fixture
+def add_route(app):
+    added = []
+
+    def add(path, endpoint):
+        app.add_api_route(path, endpoint)
+        added.append(app.router.routes[-1])
+
+    yield add
+
+    for route in added:
+        app.router.routes.remove(route)
+
+
+def test_monitor_runs_in_strict_mode(client):
+    assert loop_monitor.strict
+
+
+def test_blocking_async_route_fails_request(client, add_route):
+    async def blocking():
+        # async def 路由中呼叫同步的 sleep，整段期間事件迴圈無法處理其他工作
+        time.sleep(loop_monitor.threshold * 3)
+        return {}
+
+    add_route("/tests/loop/blocking", blocking)
+    
+    with pytest.raises(LoopBlockedError):
+        client.get("/tests/loop/blocking")
+
+
+def test_awaiting_async_route_succeeds(client, add_route):
+    async def awaiting():
+        await asyncio.sleep(loop_monitor.threshold * 3)
+        return {}
+
+    add_route("/tests/loop/awaiting", awaiting)
+    
+    assert client.get("/tests/loop/awaiting").status_code == 200
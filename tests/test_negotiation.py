@@ -0,0 +1,24 @@
+import msgpack
+
+from factories import create_blog
+
+
+def test_msgpack_matches_json(app, client, user):
+    db = app.state.test_session()
+    try:
+        create_blog(db, user["id"])
+    finally:
+        db.close()
+    
+    json_response = client.get("/public/blogs")
+    msgpack_response = client.get("/public/blogs", headers={"Accept": "application/msgpack"})
+    
+    assert msgpack_response.headers["content-type"] == "application/msgpack"
+    assert "Accept" in msgpack_response.headers["vary"]
+    assert msgpack.unpackb(msgpack_response.content) == json_response.json()
+
+
+def test_json_preferred_by_quality(client):
+    response = client.get("/public/blogs", headers={"Accept": "application/msgpack;q=0.5, application/json"})
+    
+    assert response.headers["content-type"].startswith("application/json")
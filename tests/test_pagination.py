@@ -0,0 +1,46 @@
+from fastapi import Response
+
+from factories import create_blog, create_tag
+from src.utils.pagination import Total, paginate
+
+
+def test_filtered_total_is_exact(app, client, user):
+    db = app.state.test_session()
+    try:
+        tag_id = create_tag(db)
+        for _ in range(3):
+            create_blog(db, user["id"], tag_ids=[tag_id])
+        create_blog(db, user["id"], tag_ids=[tag_id], is_draft=True)
+    finally:
+        db.close()
+    
+    response = client.get("/public/blogs", params={"tag_id": tag_id, "limit": 2, "include_total": True})
+    
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == "3"
+    assert "X-Total-Count-Estimate" not in response.headers
+    assert response.headers["X-Has-More"] == "true"
+
+
+def test_unfiltered_total_is_omitted_without_mysql(app, client, user):
+    # 未過濾的總數來自 MySQL 的 information_schema，SQLite 上不回傳總數而非失敗
+    db = app.state.test_session()
+    try:
+        create_blog(db, user["id"])
+    finally:
+        db.close()
+    
+    response = client.get("/public/blogs", params={"include_total": True})
+    
+    assert response.status_code == 200
+    assert "X-Total-Count" not in response.headers
+    assert "X-Total-Count-Estimate" not in response.headers
+
+
+def test_estimated_total_uses_estimate_header():
+    response = Response()
+    items = paginate(response, [1, 2, 3], 2, str, Total(42, estimated=True))
+    
+    assert items == [1, 2]
+    assert response.headers["X-Total-Count-Estimate"] == "42"
+    assert "X-Total-Count" not in response.headers
@@ -0,0 +1,104 @@
+"""
+列表路由的查詢數不應隨頁面大小成長 (N+1)
+
+DB_STRICT_LOADING 下未預先載入的關聯會直接拋出錯誤，這裡再以 before_cursor_execute 計算每個請求實際送出的查詢數
+"""
+import pytest
+
+from factories import create_blog, create_category, create_comment, create_tag
+
+PAGE_SIZES = (1, 5, 10)
+
+
+@pytest.fixture(scope="module")
+def blogs(app, user):
+    db = app.state.test_session()
+    try:
+        tag_ids = [create_tag(db) for _ in range(3)]
+        category_ids = [create_category(db) for _ in range(2)]
+        return [create_blog(db, user["id"], tag_ids, category_ids) for _ in range(max(PAGE_SIZES) + 1)]
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="module")
+def commented_blog(app, user, blogs):
+    db = app.state.test_session()
+    try:
+        blog_id = blogs[0]
+        for _ in range(max(PAGE_SIZES) + 1):
+            root_id = create_comment(db, user["id"], blog_id)
+            for _ in range(4):
+                create_comment(db, user["id"], blog_id, parent_id=root_id)
+        return blog_id
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("limit", PAGE_SIZES)
+def test_public_blog_list_queries(client, query_counter, blogs, limit):
+    with query_counter.count() as queries:
+        response = client.get("/public/blogs", params={"limit": limit})
+    
+    assert response.status_code == 200
+    assert len(response.json()) == limit
+    assert all(blog["tags"] and blog["categories"] for blog in response.json())
+    # 文章 + 標籤 + 分類 + 作者
+    assert len(queries) == 4, queries.statements
+
+
+@pytest.mark.parametrize("limit", PAGE_SIZES)
+def test_private_blog_list_queries(client, query_counter, auth_headers, blogs, limit):
+    with query_counter.count() as queries:
+        response = client.get("/private/blogs", params={"limit": limit}, headers=auth_headers)
+    
+    assert response.status_code == 200
+    assert len(response.json()) == limit
+    # 目前用戶 + 文章 + 標籤 + 分類 + 作者
+    assert len(queries) == 5, queries.statements
+
+
+@pytest.mark.parametrize("limit", PAGE_SIZES)
+def test_comment_thread_list_queries(client, query_counter, auth_headers, commented_blog, limit):
+    with query_counter.count() as queries:
+        response = client.get(f"/private/comments/blog/{commented_blog}", params={"limit": limit}, headers=auth_headers)
+    
+    assert response.status_code == 200
+    assert len(response.json()) == limit
+    assert all(len(comment["replies"]) == 3 for comment in response.json())
+    # 目前用戶 + 討論串 + 評論者 + 評論者帳號
+    assert len(queries) == 4, queries.statements
+
+
+@pytest.mark.parametrize("path", ("/public/blogs", "/private/blogs"))
+def test_blog_list_skips_content_column(client, query_counter, auth_headers, blogs, path):
+    with query_counter.count() as queries:
+        response = client.get(path, params={"limit": 10}, headers=auth_headers)
+    
+    assert response.status_code == 200
+    # 列表只需要摘要欄位，主查詢的 SELECT 子句不應包含文章內容
+    blog_select = next(statement for statement in queries.statements if "FROM blogs" in statement)
+    columns = blog_select.split("FROM blogs")[0]
+    assert "blogs.title" in columns
+    assert "blogs.content" not in columns
+
+
+# get_read_db / get_async_read_db 使用 autocommit 連線，讀取請求不應送出任何交易語句
+READ_ONLY_ROUTES = ("/public/blogs", "/private/blogs", "/private/comments/blog/{blog_id}")
+
+
+@pytest.mark.parametrize("path", READ_ONLY_ROUTES)
+def test_read_only_routes_skip_transactions(client, transaction_counter, auth_headers, commented_blog, path):
+    with transaction_counter.count() as statements:
+        response = client.get(path.format(blog_id=commented_blog), headers=auth_headers)
+    
+    assert response.status_code == 200
+    assert statements.statements == []
+
+
+def test_write_session_records_transactions(db, transaction_counter):
+    # 確認交易語句確實會被記錄，避免上面的檢查因記錄失效而通過
+    with transaction_counter.count() as statements:
+        create_tag(db)
+    
+    assert {"BEGIN", "COMMIT"} <= set(statements.statements)
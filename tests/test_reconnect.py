@@ -0,0 +1,141 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+from src.database import ping
+from src.utils.handler import retry_on_disconnect
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # 以可控制的時鐘取代 ping 模組使用的 time.monotonic
+    now = {"value": 1000.0}
+    monkeypatch.setattr(ping, "time", SimpleNamespace(monotonic=lambda: now["value"]))
+    return now
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ping.db'}", poolclass=QueuePool, pool_size=1, max_overflow=0)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def pings(engine, monkeypatch):
+    calls = []
+    do_ping = engine.dialect.do_ping
+
+    def counting_ping(dbapi_connection):
+        calls.append(dbapi_connection)
+        return do_ping(dbapi_connection)
+
+    monkeypatch.setattr(engine.dialect, "do_ping", counting_ping)
+    return calls
+
+
+def checkout(engine):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def test_idle_ping_skips_recently_used_connections(engine, clock, pings):
+    ping.install_idle_ping(engine, idle_seconds=30)
+
+    for _ in range(3):
+        checkout(engine)
+        clock["value"] += 10
+
+    assert pings == []
+
+
+def test_idle_ping_checks_idle_connections(engine, clock, pings):
+    ping.install_idle_ping(engine, idle_seconds=30)
+    checkout(engine)
+
+    clock["value"] += 31
+    checkout(engine)
+
+    assert len(pings) == 1
+
+
+def test_failed_ping_replaces_connection(engine, clock, monkeypatch):
+    ping.install_idle_ping(engine, idle_seconds=30)
+    checkout(engine)
+    first = engine.pool._pool.queue[0].dbapi_connection
+
+    def failing_ping(dbapi_connection):
+        raise ConnectionError("server has gone away")
+
+    monkeypatch.setattr(engine.dialect, "do_ping", failing_ping)
+    clock["value"] += 31
+
+    # 連線池捨棄驗證失敗的連線，改用新建立的連線 (新連線不需驗證)
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT 1")).scalar() == 1
+        assert connection.connection.dbapi_connection is not first
+
+
+def disconnect_error() -> DBAPIError:
+    return DBAPIError("SELECT 1", None, ConnectionError("server has gone away"), connection_invalidated=True)
+
+
+def flaky_read(errors):
+    calls = []
+
+    @retry_on_disconnect
+    def read(db):
+        calls.append(db.in_transaction())
+        if errors:
+            raise errors.pop(0)
+        return db.execute(text("SELECT 1")).scalar()
+
+    return read, calls
+
+
+def test_retry_on_disconnect_retries_once_outside_transaction(engine):
+    read, calls = flaky_read([disconnect_error()])
+
+    with Session(engine) as db:
+        assert read(db) == 1
+
+    assert len(calls) == 2
+
+
+def test_retry_on_disconnect_gives_up_after_second_failure(engine):
+    read, calls = flaky_read([disconnect_error(), disconnect_error()])
+
+    with Session(engine) as db:
+        with pytest.raises(DBAPIError):
+            read(db)
+
+    assert len(calls) == 2
+
+
+def test_retry_on_disconnect_skips_open_transaction(engine):
+    read, calls = flaky_read([disconnect_error()])
+
+    with Session(engine) as db:
+        # 交易中已有先前的語句，重試會在新的交易中繼續執行而遺失先前的寫入
+        db.execute(text("SELECT 1"))
+        assert db.in_transaction()
+
+        with pytest.raises(DBAPIError):
+            read(db)
+
+    assert calls == [True]
+
+
+def test_retry_on_disconnect_ignores_other_errors(engine):
+    error = DBAPIError("SELECT 1", None, ValueError("syntax error"), connection_invalidated=False)
+    read, calls = flaky_read([error])
+
+    with Session(engine) as db:
+        with pytest.raises(DBAPIError):
+            read(db)
+
+    assert len(calls) == 1
@@ -0,0 +1,125 @@
+"""
+src/serve.py 的 PreforkServer: worker 意外結束時補上新的 worker，收到 SIGTERM 時等待進行中的請求完成
+
+以獨立行程啟動 PreforkServer 與不需資料庫的 ASGI 應用程式，回應內容為處理請求的 worker pid
+"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER_SCRIPT = """
+import asyncio, os, sys
+
+import uvicorn
+
+from src.serve import PreforkServer
+
+
+async def app(scope, receive, send):
+    if scope["path"] == "/slow":
+        await asyncio.sleep(float(os.environ["SLOW_SECONDS"]))
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": str(os.getpid()).encode()})
+
+
+config = uvicorn.Config(
+    app,
+    host="127.0.0.1",
+    port=int(sys.argv[1]),
+    lifespan="off",
+    log_level="warning",
+    timeout_graceful_shutdown=10,
+)
+PreforkServer(config, workers=1, graceful_timeout=10).run()
+"""
+
+SLOW_SECONDS = 1.5
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_pid(url: str, timeout: float = 10) -> int:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return int(httpx.get(url, timeout=timeout).text)
+        except httpx.TransportError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+@pytest.fixture
+def server():
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-c", SERVER_SCRIPT, str(port)],
+        cwd=ROOT,
+        env={**os.environ, "SLOW_SECONDS": str(SLOW_SECONDS)}
+    )
+    try:
+        yield process, f"http://127.0.0.1:{port}"
+    finally:
+        # 由主行程結束 worker，直接 kill 主行程會留下 worker
+        if process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+def test_killed_worker_is_replaced(server):
+    process, url = server
+    worker = get_pid(url)
+
+    os.kill(worker, signal.SIGKILL)
+
+    # 主行程等待一秒後補上新的 worker
+    replacement = get_pid(url)
+    assert replacement != worker
+    assert process.poll() is None
+
+
+def test_sigterm_drains_in_flight_requests(server):
+    process, url = server
+    get_pid(url)
+
+    result = {}
+
+    def slow_request():
+        try:
+            result["response"] = httpx.get(f"{url}/slow", timeout=10)
+        except httpx.HTTPError as e:
+            result["error"] = e
+
+    request = threading.Thread(target=slow_request)
+    request.start()
+    # 確保請求已送達 worker 後才開始關閉
+    time.sleep(SLOW_SECONDS / 3)
+    process.send_signal(signal.SIGTERM)
+
+    # 關閉期間不再處理新的連線
+    time.sleep(SLOW_SECONDS / 3)
+    with pytest.raises(httpx.TransportError):
+        httpx.get(url, timeout=1)
+
+    request.join(timeout=10)
+    assert "error" not in result, result.get("error")
+    assert result["response"].status_code == 200
+
+    assert process.wait(timeout=10) == 0
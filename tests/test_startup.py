@@ -0,0 +1,51 @@
+"""
+冷啟動檢查: 於新的直譯器中匯入 src.server，不載入延遲載入的模組
+
+匯入時間的預算檢查依機器速度而定，標記為 benchmark，設定 TEST_BENCHMARK=true 時才執行
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import pytest
+
+from src.server import STARTUP_IMPORT_BUDGET_MS
+
+TEST_BENCHMARK = os.getenv("TEST_BENCHMARK", "false").lower() == "true"
+
+# 只在使用時才載入的模組 (S3 上傳、密碼雜湊、Swagger 頁面)
+LAZY_MODULES = ("boto3", "botocore", "passlib", "src.utils.swagger")
+
+IMPORT_SCRIPT = f"""
+import json, sys
+import src.server as server
+print(json.dumps({{
+    "import_ms": server.IMPORT_MS,
+    "loaded": [name for name in {LAZY_MODULES!r} if name in sys.modules],
+}}))
+"""
+
+
+def import_server() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_skips_lazy_modules():
+    assert import_server()["loaded"] == []
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(not TEST_BENCHMARK, reason="TEST_BENCHMARK is not set")
+def test_import_time_within_budget():
+    # 取三次的中位數，降低單次量測的雜訊
+    import_ms = statistics.median(import_server()["import_ms"] for _ in range(3))
+    assert import_ms <= STARTUP_IMPORT_BUDGET_MS, f"Import took {import_ms:.0f}ms, budget is {STARTUP_IMPORT_BUDGET_MS}ms"